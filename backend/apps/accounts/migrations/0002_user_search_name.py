@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:26
+
+from django.db import migrations, models
+
+
+def backfill_search_names(apps, schema_editor):
+    from apps.lawyers.text import normalize
+
+    User = apps.get_model("accounts", "User")
+    users = []
+    for user in User.objects.only("id", "first_name", "last_name").iterator(chunk_size=500):
+        user.search_name = normalize(f"{user.first_name} {user.last_name}")
+        users.append(user)
+    User.objects.bulk_update(users, ["search_name"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="search_name",
+            field=models.CharField(blank=True, editable=False, max_length=161),
+        ),
+        migrations.RunPython(backfill_search_names, migrations.RunPython.noop),
+    ]
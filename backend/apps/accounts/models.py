@@ -36,6 +36,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_phone_verified = models.BooleanField(default=False)
     is_staff = models.BooleanField(default=False)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    # normalize(full_name), kept in save() for the admin user search
+    search_name = models.CharField(max_length=161, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -50,6 +52,15 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f'{self.full_name} ({self.phone})'
 
+    def save(self, *args, **kwargs):
+        from apps.lawyers.text import normalize
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'first_name', 'last_name'} & set(update_fields):
+            self.search_name = normalize(self.full_name)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_name'}
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         return f'{self.first_name} {self.last_name}'.strip()
@@ -8,7 +8,8 @@ from rest_framework_simplejwt.exceptions import TokenError
 
 from .models import User
 from .serializers import RegisterSerializer, UserSerializer, TokenResponseSerializer
-from apps.otp.utils import create_otp, verify_otp
+from apps.otp.sms import SMSError
+from apps.otp.utils import create_otp, send_otp, verify_otp
 
 
 @api_view(['POST'])
@@ -25,14 +26,12 @@ def register(request):
 
     user = ser.save()
     otp_code = create_otp(phone)
+    # The console SMS backend (development default) prints the OTP in the backend terminal.
+    try:
+        send_otp(phone, otp_code)
+    except SMSError:
+        return Response({'detail': 'Account created, but the OTP could not be sent. Please resend.'}, status=503)
 
-    # Development helper: print OTP in backend terminal while SMS provider is not connected.
-    print("=" * 60)
-    print(f"LEXARA DEV OTP for {phone}: {otp_code}")
-    print("=" * 60)
-
-    # In production, send via SMS here:
-    # send_sms(phone, f"Your Lexara OTP: {otp_code}")
     # For development, return otp in response:
     return Response({
         'detail': 'OTP sent to your phone.',
@@ -87,7 +86,10 @@ def request_otp(request):
         return Response({'detail': 'No account found with this phone number.'}, status=404)
 
     otp_code = create_otp(phone)
-    # send_sms(phone, f"Your Lexara OTP: {otp_code}")
+    try:
+        send_otp(phone, otp_code)
+    except SMSError:
+        return Response({'detail': 'Could not send OTP. Please try again.'}, status=503)
 
     return Response({
         'detail': 'OTP sent.',
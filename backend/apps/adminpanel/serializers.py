@@ -1,29 +1,10 @@
 from rest_framework import serializers
 from apps.accounts.models import User
-from apps.lawyers.models import LawyerProfile, PracticeArea, Review
+from apps.lawyers.models import LawyerProfile, PracticeArea, Review, PRACTICE_AREA_FA
 from apps.bookings.models import Booking, BookingDocument, BookingCancellationLog
 from .models import CommissionSetting, DiscountCode, LawyerSettlement, SiteContent
 
 
-PRACTICE_AREA_FA = {
-    'corporate': 'حقوق شرکت‌ها',
-    'criminal': 'کیفری و جزایی',
-    'family': 'خانواده و طلاق',
-    'immigration': 'مهاجرت',
-    'intellectual_property': 'مالکیت فکری',
-    'real_estate': 'ملک و املاک',
-    'employment': 'حقوق کار و استخدام',
-    'tax': 'حقوق مالیاتی',
-    'personal_injury': 'خسارت و دیه',
-    'bankruptcy': 'ورشکستگی',
-    'civil_litigation': 'دعاوی حقوقی',
-    'estate_planning': 'وصیت و ارث',
-    'healthcare': 'حقوق پزشکی و سلامت',
-    'environmental': 'حقوق محیط زیست',
-    'international': 'حقوق بین‌الملل',
-}
-
-
 class AdminUserSerializer(serializers.ModelSerializer):
     full_name = serializers.ReadOnlyField()
     avatar_url = serializers.SerializerMethodField()
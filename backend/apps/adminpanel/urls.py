@@ -11,6 +11,7 @@ urlpatterns = [
     path('cancellations/', views.cancellation_logs, name='admin_cancellation_logs'),
     path('site-content/', views.site_content, name='admin_site_content'),
     path('overview/', views.overview, name='admin_overview'),
+    path('cache-stats/', views.cache_stats, name='admin_cache_stats'),
     path('users/', views.users, name='admin_users'),
     path('users/<uuid:user_id>/', views.user_detail, name='admin_user_detail'),
     path('lawyers/', views.lawyers, name='admin_lawyers'),
@@ -1,12 +1,17 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from django.db.models import Q, Count, Sum
+from django.db.models import Q, Count, Max, Sum
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 
 from apps.accounts.models import User
+from apps.lawyers.cache import cache_stats as lawyer_cache_stats
+from apps.lawyers.cities import city_q
+from apps.lawyers.conditional import make_etag, not_modified, set_validators
 from apps.lawyers.models import LawyerProfile, Review
+from apps.lawyers.search import search_queryset
+from apps.lawyers.text import normalize
 from apps.bookings.models import Booking, BookingDocument, BookingCancellationLog
 from .models import CommissionSetting, DiscountCode, LawyerSettlement, SiteContent
 from .serializers import (
@@ -75,6 +80,13 @@ def overview(request):
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """Hit/miss counters of the public lawyer list/detail response cache."""
+    return Response(lawyer_cache_stats())
+
+
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def users(request):
@@ -84,7 +96,7 @@ def users(request):
     active = request.query_params.get('is_active', '').strip()
 
     if q:
-        qs = qs.filter(Q(first_name__icontains=q) | Q(last_name__icontains=q) | Q(phone__icontains=q))
+        qs = qs.filter(Q(search_name__contains=normalize(q)) | Q(phone__icontains=normalize(q)))
     if role in ('customer', 'lawyer'):
         qs = qs.filter(role=role)
     if active in ('true', 'false'):
@@ -103,16 +115,13 @@ def lawyers(request):
 
     if q:
         qs = qs.filter(
-            Q(user__first_name__icontains=q) |
-            Q(user__last_name__icontains=q) |
-            Q(user__phone__icontains=q) |
-            Q(bar_number__icontains=q) |
-            Q(headline__icontains=q)
+            Q(id__in=search_queryset(LawyerProfile.objects.all(), q).values('id')) |
+            Q(user__phone__icontains=normalize(q))
         )
     if status in ('pending', 'verified', 'rejected'):
         qs = qs.filter(verification_status=status)
     if city:
-        qs = qs.filter(Q(city__icontains=city) | Q(office_address__icontains=city))
+        qs = qs.filter(city_q(city))
 
     return _paginate(request, qs, AdminLawyerSerializer)
 
@@ -446,11 +455,23 @@ def site_content(request):
         ('privacy', 'حریم خصوصی', 'سیاست حریم خصوصی'),
         ('cancel_policy', 'قوانین لغو رزرو', 'لغو قبل از ۲۴ ساعت با کسر ۹٪ و لغو کمتر از ۲۴ ساعت بدون بازگشت وجه.'),
     ]
-    for key, title, body in defaults:
-        SiteContent.objects.get_or_create(key=key, defaults={'title': title, 'body': body, 'is_active': True})
+    existing = set(SiteContent.objects.values_list('key', flat=True))
+    missing = [
+        SiteContent(key=key, title=title, body=body, is_active=True)
+        for key, title, body in defaults if key not in existing
+    ]
+    if missing:
+        SiteContent.objects.bulk_create(missing, ignore_conflicts=True)
 
     if request.method == 'GET':
-        return Response(SiteContentSerializer(SiteContent.objects.all(), many=True).data)
+        # Validators from one aggregate, so an unchanged page is a 304 without serializing.
+        state = SiteContent.objects.aggregate(count=Count('id'), last=Max('updated_at'))
+        etag = make_etag('site-content', state['count'], state['last'])
+        response = not_modified(request, etag, state['last'])
+        if response is not None:
+            return response
+        data = SiteContentSerializer(SiteContent.objects.all(), many=True).data
+        return set_validators(Response(data), etag, state['last'])
 
     key = request.data.get('key')
     if not key:
@@ -0,0 +1,95 @@
+"""Race-free booking creation.
+
+Two customers posting the same slot at once used to both pass the
+"is it free?" check and both insert. `create_booking` now, in one
+transaction:
+
+1. validates the request (an early, unlocked conflict check),
+2. bumps `total_bookings` with an F() UPDATE, which also row-locks the
+   lawyer and so serializes concurrent bookings of that lawyer,
+3. re-checks the occupancy bitmap under that lock, inserts, and queues
+   the confirmation SMS in the outbox (outbox.py).
+
+The partial unique constraint `booking_active_slot_uniq` on (lawyer,
+scheduled_at) for pending/confirmed bookings backs this up at the database
+level. Serialization failures and deadlocks (PostgreSQL) or a stale SQLite
+snapshot are retried a bounded number of times with jittered backoff.
+
+`update_booking` applies the same lock, re-check and IntegrityError
+mapping when a lawyer moves a cancelled/rejected booking back to
+pending/confirmed, since its slot may have been rebooked meanwhile.
+"""
+import random
+import time
+
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import F
+from rest_framework import serializers
+
+from apps.lawyers.models import LawyerProfile
+from apps.lawyers.next_slot import ACTIVE_BOOKING_STATUSES
+from .occupancy import conflicts
+from .outbox import queue_booking_created
+
+MAX_ATTEMPTS = 4
+RETRY_BASE_DELAY = 0.02
+RETRYABLE_PGCODES = {'40001', '40P01'}  # serialization_failure, deadlock_detected
+SLOT_TAKEN = {'scheduled_at': 'این ساعت قبلاً رزرو شده است.'}
+
+
+def is_retryable(exc):
+    cause = exc.__cause__
+    if getattr(cause, 'pgcode', None) in RETRYABLE_PGCODES:
+        return True
+    return 'database is locked' in str(exc)
+
+
+def _create_once(data, customer):
+    from .serializers import CreateBookingSerializer
+
+    with transaction.atomic():
+        ser = CreateBookingSerializer(data=data)
+        ser.is_valid(raise_exception=True)
+        lawyer = ser.validated_data['lawyer']
+        LawyerProfile.objects.filter(id=lawyer.id).update(total_bookings=F('total_bookings') + 1)
+        scheduled_at = ser.validated_data['scheduled_at']
+        if conflicts(lawyer.id, scheduled_at, ser.validated_data.get('duration_minutes') or 60, lock=True):
+            raise serializers.ValidationError(SLOT_TAKEN)
+        try:
+            with transaction.atomic():
+                booking = ser.save(customer=customer, status='confirmed')
+        except IntegrityError:
+            raise serializers.ValidationError(SLOT_TAKEN)
+        queue_booking_created(booking)
+        return booking
+
+
+def create_booking(data, customer):
+    """Validate and insert a confirmed booking; raises ValidationError when the slot is taken."""
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return _create_once(data, customer)
+        except OperationalError as exc:
+            if attempt == MAX_ATTEMPTS or not is_retryable(exc):
+                raise
+            time.sleep(RETRY_BASE_DELAY * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+
+def update_booking(ser):
+    """Save a validated LawyerBookingUpdateSerializer; raises ValidationError when reactivating a taken slot."""
+    booking = ser.instance
+    reactivating = (
+        booking.status not in ACTIVE_BOOKING_STATUSES
+        and ser.validated_data.get('status') in ACTIVE_BOOKING_STATUSES
+    )
+    if not reactivating:
+        return ser.save()
+    with transaction.atomic():
+        list(LawyerProfile.objects.select_for_update().filter(id=booking.lawyer_id).values_list('id'))
+        if conflicts(booking.lawyer_id, booking.scheduled_at, booking.duration_minutes or 60, lock=True):
+            raise serializers.ValidationError(SLOT_TAKEN)
+        try:
+            with transaction.atomic():
+                return ser.save()
+        except IntegrityError:
+            raise serializers.ValidationError(SLOT_TAKEN)
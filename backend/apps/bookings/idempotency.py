@@ -0,0 +1,137 @@
+"""`Idempotency-Key` support for POSTs that clients retry (booking, cancel, document upload).
+
+Mobile clients on flaky networks resend POSTs whose response they never
+saw. A view wrapped in `idempotent` that receives an `Idempotency-Key`
+header:
+
+- claims (user, key) by inserting an IdempotencyKey row in its own
+  transaction. The unique constraint makes the row the in-flight lock: a
+  duplicate arriving meanwhile gets 409 until the first request finishes,
+  or until its IDEMPOTENCY_LOCK_SECONDS lease lapses after a crash.
+- stores a 2xx response and replays it (with `Idempotent-Replayed: true`)
+  to retries within IDEMPOTENCY_KEY_TTL, without running the view again.
+- releases the key when the view fails. These views roll their writes back
+  on failure, so a retry simply runs again.
+- answers 422 when the key comes back with a different method, path or
+  body. Uploaded files are fingerprinted by name and size.
+
+Requests without the header behave as before. Expired rows are removed by
+`manage.py purge_idempotency_keys` and, for a reused key, on lookup.
+"""
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+CLAIM_ATTEMPTS = 3
+
+
+def _ttl():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 3600))
+
+
+def _lease():
+    return timedelta(seconds=getattr(settings, 'IDEMPOTENCY_LOCK_SECONDS', 60))
+
+
+def _normalize(value):
+    if hasattr(value, 'read'):  # uploaded file
+        return [getattr(value, 'name', ''), getattr(value, 'size', None)]
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {name: _normalize(item) for name, item in value.items()}
+    return value
+
+
+def fingerprint(request):
+    data = request.data
+    if hasattr(data, 'lists'):  # QueryDict from form / multipart bodies
+        data = dict(data.lists())
+    payload = json.dumps([request.method, request.path, _normalize(data)], sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _in_progress(record, now):
+    retry_after = max(1, int((record.locked_until - now).total_seconds()))
+    return Response(
+        {'detail': 'درخواستی با همین Idempotency-Key در حال انجام است.'},
+        status=409, headers={'Retry-After': str(retry_after)},
+    )
+
+
+def _claim(user, key, request_fingerprint):
+    """(record, None) when this request now owns the key, else (None, response to return instead)."""
+    for _ in range(CLAIM_ATTEMPTS):
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user, key=key, fingerprint=request_fingerprint,
+                    locked_until=now + _lease(), expires_at=now + _ttl(),
+                )
+            return record, None
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=user, key=key).first()
+        if record is None:
+            continue
+        if record.expires_at <= now:
+            IdempotencyKey.objects.filter(pk=record.pk, expires_at__lte=now).delete()
+            continue
+        if record.fingerprint != request_fingerprint:
+            return None, Response({'detail': 'این Idempotency-Key قبلاً برای درخواست دیگری استفاده شده است.'}, status=422)
+        if record.status_code is not None:
+            return None, Response(record.response_body, status=record.status_code, headers={REPLAYED_HEADER: 'true'})
+        if record.locked_until > now:
+            return None, _in_progress(record, now)
+        # The request holding the key died without finishing: take over its lease.
+        locked_until = now + _lease()
+        taken = IdempotencyKey.objects.filter(
+            pk=record.pk, status_code__isnull=True, locked_until=record.locked_until,
+        ).update(locked_until=locked_until)
+        if taken:
+            record.locked_until = locked_until
+            return record, None
+    return None, Response({'detail': 'درخواستی با همین Idempotency-Key در حال انجام است.'}, status=409)
+
+
+def idempotent(view):
+    """Honour the `Idempotency-Key` header on POSTs to `view` (place below @api_view)."""
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.META.get(HEADER, '').strip()
+        if request.method != 'POST' or not key or not request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({'detail': f'Idempotency-Key حداکثر {MAX_KEY_LENGTH} نویسه است.'}, status=400)
+
+        record, response = _claim(request.user, key, fingerprint(request))
+        if response is not None:
+            return response
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+            raise
+        if isinstance(response, Response) and 200 <= response.status_code < 300:
+            record.status_code = response.status_code
+            record.response_body = response.data
+            record.locked_until = None
+            record.save(update_fields=['status_code', 'response_body', 'locked_until'])
+        else:
+            IdempotencyKey.objects.filter(pk=record.pk).delete()
+        return response
+
+    return wrapper
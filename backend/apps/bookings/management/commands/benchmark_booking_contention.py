@@ -0,0 +1,149 @@
+import multiprocessing
+import threading
+import time as clock
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from apps.bookings.creation import create_booking
+from apps.bookings.models import Booking
+
+OUTCOMES = ('won', 'slot_taken', 'error')
+
+
+def attempt(lawyer_id, customer_id, scheduled_at, duration, barrier):
+    """One contender: wait for everyone, then try to book. Returns (outcome, seconds)."""
+    from apps.accounts.models import User
+
+    customer = User.objects.get(id=customer_id)
+    payload = {
+        'lawyer': str(lawyer_id),
+        'scheduled_at': scheduled_at.isoformat(),
+        'duration_minutes': duration,
+        'subject': 'contention benchmark',
+        'description': 'contention benchmark booking',
+    }
+    barrier.wait()
+    started = clock.perf_counter()
+    try:
+        create_booking(payload, customer)
+        outcome = 'won'
+    except ValidationError:
+        outcome = 'slot_taken'
+    except Exception:  # surfaced as a count; the run then fails
+        outcome = 'error'
+    return outcome, clock.perf_counter() - started
+
+
+def _thread_worker(args, results):
+    try:
+        results.append(attempt(*args))
+    finally:
+        connections.close_all()
+
+
+def _process_worker(args, queue):
+    connections.close_all()  # never share the parent's sockets / file handles
+    queue.put(attempt(*args))
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Hammer one slot of a throwaway lawyer with concurrent booking requests from threads '
+        'and processes and fail unless exactly one of them wins. Cleans up after itself.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--rounds', type=int, default=3)
+
+    def handle(self, *args, **options):
+        lawyer, customers = self.setup(max(options['threads'], options['processes']))
+        failures = []
+        try:
+            day = timezone.localdate() + timedelta(days=10)
+            for round_no in range(options['rounds']):
+                slot_day = day + timedelta(days=round_no)
+                for mode, workers in (('threads', options['threads']), ('processes', options['processes'])):
+                    hour = 10 if mode == 'threads' else 15
+                    # Same start for everyone, then overlapping starts a quarter hour apart.
+                    for variant, step in (('same slot', 0), ('overlapping', 15)):
+                        base = timezone.make_aware(datetime.combine(slot_day, time(hour + (2 if step else 0))))
+                        contenders = [
+                            (lawyer.id, customers[i].id, base + timedelta(minutes=step * (i % 4)), 60)
+                            for i in range(workers)
+                        ]
+                        failures += self.run_round(lawyer, mode, variant, contenders, base)
+        finally:
+            self.teardown(lawyer, customers)
+        if failures:
+            raise CommandError('; '.join(failures))
+        self.stdout.write(self.style.SUCCESS('Every round had exactly one winner.'))
+
+    def run_round(self, lawyer, mode, variant, contenders, base):
+        before = type(lawyer).objects.get(id=lawyer.id).total_bookings
+        started = clock.perf_counter()
+        outcomes = self.run_threads(contenders) if mode == 'threads' else self.run_processes(contenders)
+        wall = clock.perf_counter() - started
+
+        counts = {name: sum(1 for outcome, _ in outcomes if outcome == name) for name in OUTCOMES}
+        window = (base - timedelta(hours=1), base + timedelta(hours=2))
+        stored = Booking.objects.filter(lawyer=lawyer, scheduled_at__range=window, status='confirmed').count()
+        bumped = type(lawyer).objects.get(id=lawyer.id).total_bookings - before
+        slowest = max(seconds for _, seconds in outcomes) * 1000
+        self.stdout.write(
+            f'{mode:>9} {variant:<12} {len(contenders):>3} contenders: '
+            f'{counts["won"]} won, {counts["slot_taken"]} slot taken, {counts["error"]} errors, '
+            f'{stored} stored, total_bookings +{bumped}, wall {wall * 1000:.0f} ms, slowest {slowest:.0f} ms'
+        )
+        if counts['won'] == 1 and counts['error'] == 0 and stored == 1 and bumped == 1:
+            return []
+        return [f'{mode}/{variant}: {counts} stored={stored} total_bookings +{bumped}']
+
+    def run_threads(self, contenders):
+        barrier, results = threading.Barrier(len(contenders)), []
+        threads = [threading.Thread(target=_thread_worker, args=((*c, barrier), results)) for c in contenders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def run_processes(self, contenders):
+        ctx = multiprocessing.get_context('fork')
+        barrier, queue = ctx.Barrier(len(contenders)), ctx.Queue()
+        connections.close_all()
+        processes = [ctx.Process(target=_process_worker, args=((*c, barrier), queue)) for c in contenders]
+        for process in processes:
+            process.start()
+        results = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+        return results
+
+    # ── Fixtures ──────────────────────────────────────────
+
+    def setup(self, customers):
+        from apps.accounts.models import User
+        from apps.lawyers.models import LawyerProfile
+
+        stamp = int(clock.time() * 1000) % 10 ** 7
+        user = User.objects.create_user(phone=f'0999{stamp:07d}', first_name='Bench', last_name='Lawyer', role='lawyer')
+        lawyer = LawyerProfile.objects.create(
+            user=user, bar_number=f'BENCH-{stamp}', verification_status='verified', is_accepting_clients=True,
+        )
+        customers = [
+            User.objects.create_user(phone=f'0998{stamp:07d}{i:02d}', first_name='Bench', last_name=str(i), role='customer')
+            for i in range(customers)
+        ]
+        return lawyer, customers
+
+    def teardown(self, lawyer, customers):
+        from apps.accounts.models import User
+
+        User.objects.filter(id__in=[lawyer.user_id] + [c.id for c in customers]).delete()
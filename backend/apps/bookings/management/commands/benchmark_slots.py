@@ -0,0 +1,64 @@
+import random
+import time as clock
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from apps.bookings.slot_engine import day_slots, np
+
+
+def legacy_slots(day, avails, booked_times):
+    """The per-slot scan available_slots used before slot_engine (start times only, O(slots × bookings))."""
+    slots = []
+    for avail in avails:
+        current = datetime.combine(day, avail.start_time)
+        end_time = datetime.combine(day, avail.end_time)
+        duration = timedelta(minutes=avail.slot_duration_minutes)
+        while current + duration <= end_time:
+            is_booked = any(abs((bt - current).total_seconds()) < 60 for bt in booked_times)
+            slots.append({
+                'time': current.strftime('%H:%M'),
+                'datetime': current.isoformat(),
+                'available': not is_booked,
+                'is_booked': is_booked,
+                'duration_minutes': avail.slot_duration_minutes,
+            })
+            current += duration
+    return slots
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmark slot generation for one day against increasingly dense calendars (no database).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slot-minutes', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument('--bookings', default='0,10,50,100,200,280',
+                            help='Comma-separated booking counts to measure.')
+
+    def handle(self, *args, **options):
+        random.seed(1)
+        day = date(2030, 1, 7)
+        step = options['slot_minutes']
+        avails = [SimpleNamespace(start_time=time(0, 0), end_time=time(23, 59), slot_duration_minutes=step)]
+        slot_count = (24 * 60 - 1) // step
+        self.stdout.write(f'{slot_count} slots of {step} min, {options["repeat"]} runs each, '
+                          f'numpy {"on" if np is not None else "off"}')
+        self.stdout.write(f'{"bookings":>9} {"legacy µs":>11} {"engine µs":>11}')
+
+        for count in [int(n) for n in options['bookings'].split(',')]:
+            starts = random.sample(range(slot_count), min(count, slot_count))
+            booked = [datetime.combine(day, time.min) + timedelta(minutes=s * step) for s in starts]
+            bookings = [(moment, random.choice([step, 2 * step, 60])) for moment in booked]
+
+            legacy = self.measure(lambda: legacy_slots(day, avails, booked), options['repeat'])
+            engine = self.measure(lambda: day_slots(day, avails, bookings), options['repeat'])
+            self.stdout.write(f'{count:>9} {legacy:>11.0f} {engine:>11.0f}')
+
+    @staticmethod
+    def measure(func, repeat):
+        started = clock.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (clock.perf_counter() - started) / repeat * 1e6
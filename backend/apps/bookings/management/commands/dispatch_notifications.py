@@ -0,0 +1,40 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.bookings.outbox import BATCH_SIZE, dispatch_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Deliver queued notifications (SMS) from the outbox. Runs until stopped; '
+        'start several for throughput, or use --once from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=BATCH_SIZE, help='Rows claimed per round trip.')
+        parser.add_argument('--idle', type=float, default=2.0, help='Seconds to sleep when nothing is due.')
+        parser.add_argument('--once', action='store_true', help='Drain what is due now, then exit.')
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        total_sent = total_failed = 0
+        while self.running:
+            close_old_connections()
+            sent, failed = dispatch_batch(options['batch'])
+            total_sent, total_failed = total_sent + sent, total_failed + failed
+            if sent or failed:
+                self.stdout.write(f'sent {sent}, failed {failed}')
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['idle'])
+        self.stdout.write(self.style.SUCCESS(f'Delivered {total_sent} notifications, {total_failed} failed attempts.'))
+
+    def stop(self, *args):
+        self.running = False
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.bookings.occupancy import rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'Rebuild every per-day occupancy bitmap from the active bookings.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = rebuild_all()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} occupancy rows.'))
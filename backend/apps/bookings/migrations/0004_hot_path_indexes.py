@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "bookings",
+            "0003_booking_cancellation_fee_booking_cancellation_reason_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["lawyer", "scheduled_at"], name="booking_lawyer_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["lawyer", "status", "scheduled_at"],
+                name="booking_lawyer_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["customer", "status", "scheduled_at"],
+                name="booking_customer_status_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_occupancy(apps, schema_editor):
+    from collections import defaultdict
+    from apps.bookings.occupancy import interval_masks, to_bytes
+
+    Booking = apps.get_model("bookings", "Booking")
+    LawyerDayOccupancy = apps.get_model("bookings", "LawyerDayOccupancy")
+    masks = defaultdict(int)
+    booked = Booking.objects.filter(status__in=["pending", "confirmed"]).values_list(
+        "lawyer_id", "scheduled_at", "duration_minutes"
+    )
+    for lawyer_id, scheduled_at, duration in booked.iterator():
+        for day, mask in interval_masks(scheduled_at, duration).items():
+            masks[lawyer_id, day] |= mask
+    LawyerDayOccupancy.objects.bulk_create(
+        [
+            LawyerDayOccupancy(lawyer_id=lawyer_id, date=day, blocks=to_bytes(mask))
+            for (lawyer_id, day), mask in masks.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0014_lawyerprofile_rank_score"),
+        ("bookings", "0004_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LawyerDayOccupancy",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("blocks", models.BinaryField(max_length=36)),
+                (
+                    "lawyer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occupancy",
+                        to="lawyers.lawyerprofile",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "lawyer_day_occupancy",
+                "unique_together": {("lawyer", "date")},
+            },
+        ),
+        migrations.RunPython(backfill_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0005_lawyerdayoccupancy"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="booking",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ["pending", "confirmed"])),
+                fields=("lawyer", "scheduled_at"),
+                name="booking_active_slot_uniq",
+            ),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.conf import settings
+from django.utils import timezone
 import uuid
 import os
 
@@ -79,10 +81,49 @@ class Booking(models.Model):
     class Meta:
         db_table = 'bookings'
         ordering = ['-scheduled_at']
+        indexes = [
+            models.Index(fields=['lawyer', 'scheduled_at'], name='booking_lawyer_time_idx'),
+            models.Index(fields=['lawyer', 'status', 'scheduled_at'], name='booking_lawyer_status_idx'),
+            models.Index(fields=['customer', 'status', 'scheduled_at'], name='booking_customer_status_idx'),
+        ]
+        constraints = [
+            # At most one active booking per lawyer and start time, whatever the write path (see creation.py).
+            models.UniqueConstraint(
+                fields=['lawyer', 'scheduled_at'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                name='booking_active_slot_uniq',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.customer.full_name} → {self.lawyer.user.full_name} @ {self.scheduled_at:%Y-%m-%d %H:%M}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so a reschedule also frees the old day's occupancy (see occupancy.py).
+        instance._loaded_schedule = (instance.__dict__.get('scheduled_at'), instance.__dict__.get('duration_minutes'))
+        return instance
+
+
+class LawyerDayOccupancy(models.Model):
+    """Which 5-minute blocks of one lawyer's day are taken by active bookings.
+
+    288 bits in 36 bytes, rebuilt from the bookings of that day whenever one
+    of them is saved or deleted (see occupancy.py). Days without active
+    bookings have no row.
+    """
+    lawyer = models.ForeignKey('lawyers.LawyerProfile', on_delete=models.CASCADE, related_name='occupancy')
+    date = models.DateField()
+    blocks = models.BinaryField(max_length=36)
+
+    class Meta:
+        db_table = 'lawyer_day_occupancy'
+        unique_together = ('lawyer', 'date')
+
+    def __str__(self):
+        return f'{self.lawyer_id} @ {self.date}'
+
 
 class BookingDocument(models.Model):
     DOCUMENT_TYPES = [
@@ -141,3 +182,64 @@ class BookingCancellationLog(models.Model):
 
     def __str__(self):
         return f'Cancellation {self.booking_id} - {self.refund_status}'
+
+
+class NotificationOutbox(models.Model):
+    """A message to deliver after the booking change that produced it has committed.
+
+    Rows are written in the same transaction as the booking change and
+    delivered by `manage.py dispatch_notifications` (see outbox.py).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    CHANNEL_CHOICES = [
+        ('sms', 'SMS'),
+    ]
+
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES, default='sms')
+    kind = models.CharField(max_length=30)
+    recipient = models.CharField(max_length=32)
+    message = models.TextField()
+    booking = models.ForeignKey(Booking, on_delete=models.SET_NULL, null=True, blank=True, related_name='notifications')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Next time a worker may pick the row up: the retry backoff, or the lease of the worker holding it.
+    available_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'notification_outbox'
+        ordering = ['available_at', 'id']
+        indexes = [models.Index(fields=['status', 'available_at'], name='outbox_due_idx')]
+
+    def __str__(self):
+        return f'{self.kind} -> {self.recipient} ({self.status})'
+
+
+class IdempotencyKey(models.Model):
+    """The outcome of a POST sent with an `Idempotency-Key` header (see idempotency.py).
+
+    A row without `status_code` is in flight: duplicates are refused until
+    `locked_until`. Completed rows replay `status_code`/`response_body` until `expires_at`.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        unique_together = ('user', 'key')
+
+    def __str__(self):
+        return f'{self.key} ({self.status_code or "in flight"})'
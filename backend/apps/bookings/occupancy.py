@@ -0,0 +1,153 @@
+"""Per-day occupancy bitmaps (LawyerDayOccupancy) for bookings.
+
+A day is 288 blocks of 5 minutes; bit i is set when an active booking
+covers any part of block i. A conflict check for any start and duration is
+then one row read and a bitwise AND, and slot rendering reads one row per
+day instead of the bookings.
+
+The rows are derived data: `rebuild_days` recomputes them from the active
+bookings of the given days, and signals.py calls it synchronously, in the
+same transaction, whenever a booking is saved or deleted. Bookings that run
+past midnight set bits on both days.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from apps.lawyers.next_slot import ACTIVE_BOOKING_STATUSES
+from apps.lawyers.utils import day_bounds
+
+BLOCK_MINUTES = 5
+BLOCKS_PER_DAY = 24 * 60 // BLOCK_MINUTES
+BITMAP_BYTES = BLOCKS_PER_DAY // 8
+
+
+def to_int(blocks):
+    return int.from_bytes(bytes(blocks or b''), 'little')
+
+
+def to_bytes(mask):
+    return mask.to_bytes(BITMAP_BYTES, 'little')
+
+
+def _wall_clock(value):
+    return timezone.localtime(value).replace(tzinfo=None) if timezone.is_aware(value) else value
+
+
+def interval_masks(start, duration):
+    """{date: mask} covered by [start, start + duration minutes); aware datetimes are read in local time."""
+    start = _wall_clock(start)
+    end = start + timedelta(minutes=duration or 60)
+    masks = {}
+    day = start.date()
+    while datetime.combine(day, datetime.min.time()) < end:
+        midnight = datetime.combine(day, datetime.min.time())
+        first = max(int((start - midnight).total_seconds() // 60), 0) // BLOCK_MINUTES
+        last = -(-min(int((end - midnight).total_seconds() // 60), 24 * 60) // BLOCK_MINUTES)
+        if first < last:
+            masks[day] = ((1 << (last - first)) - 1) << first
+        day += timedelta(days=1)
+    return masks
+
+
+def booking_days(scheduled_at, duration):
+    """Dates touched by a booking; none when `scheduled_at` is None."""
+    if scheduled_at is None:
+        return []
+    return list(interval_masks(scheduled_at, duration))
+
+
+def intervals(mask):
+    """Merged [start, end) minute intervals of the set bits, for slot_engine."""
+    runs, block = [], 0
+    while mask:
+        if mask & 1:
+            start = block
+            while mask & 1:
+                mask >>= 1
+                block += 1
+            runs.append((start * BLOCK_MINUTES, block * BLOCK_MINUTES))
+        else:
+            skip = (mask & -mask).bit_length() - 1
+            mask >>= skip
+            block += skip
+    return runs
+
+
+def day_masks(lawyer_id, first_day, last_day=None):
+    """{date: mask} of the stored rows for one lawyer and a range of days (one query)."""
+    from .models import LawyerDayOccupancy
+
+    rows = LawyerDayOccupancy.objects.filter(
+        lawyer_id=lawyer_id, date__range=(first_day, last_day or first_day),
+    ).values_list('date', 'blocks')
+    return {day: to_int(blocks) for day, blocks in rows}
+
+
+def conflicts(lawyer_id, scheduled_at, duration, lock=False):
+    """True when [scheduled_at, + duration) overlaps an active booking. `lock` holds the day rows until commit."""
+    from .models import LawyerDayOccupancy
+
+    wanted = interval_masks(scheduled_at, duration)
+    rows = LawyerDayOccupancy.objects.filter(lawyer_id=lawyer_id, date__in=list(wanted))
+    if lock:
+        rows = rows.select_for_update()
+    return any(to_int(blocks) & wanted[day] for day, blocks in rows.values_list('date', 'blocks'))
+
+
+def rebuild_days(lawyer_id, days):
+    """Recompute the stored bitmaps of `days` from the lawyer's active bookings."""
+    from .models import Booking, LawyerDayOccupancy
+
+    days = sorted(set(days))
+    if not days:
+        return
+    # A booking that started the day before may still run into the first day.
+    start, end = day_bounds(days[0] - timedelta(days=1), days[-1])
+    masks = defaultdict(int)
+    booked = Booking.objects.filter(
+        lawyer_id=lawyer_id,
+        scheduled_at__gte=start,
+        scheduled_at__lt=end,
+        status__in=ACTIVE_BOOKING_STATUSES,
+    ).values_list('scheduled_at', 'duration_minutes')
+    for scheduled_at, duration in booked:
+        for day, mask in interval_masks(scheduled_at, duration).items():
+            masks[day] |= mask
+
+    existing = {row.date: row for row in LawyerDayOccupancy.objects.filter(lawyer_id=lawyer_id, date__in=days)}
+    to_create, to_update, empty = [], [], []
+    for day in days:
+        row, mask = existing.get(day), masks.get(day, 0)
+        if not mask:
+            if row:
+                empty.append(row.pk)
+        elif row is None:
+            to_create.append(LawyerDayOccupancy(lawyer_id=lawyer_id, date=day, blocks=to_bytes(mask)))
+        elif to_int(row.blocks) != mask:
+            row.blocks = to_bytes(mask)
+            to_update.append(row)
+    LawyerDayOccupancy.objects.bulk_create(to_create)
+    LawyerDayOccupancy.objects.bulk_update(to_update, ['blocks'])
+    LawyerDayOccupancy.objects.filter(pk__in=empty).delete()
+
+
+def rebuild_all():
+    """Rebuild every bitmap from scratch (`manage.py rebuild_occupancy`). Returns the number of rows."""
+    from .models import Booking, LawyerDayOccupancy
+
+    masks = defaultdict(int)
+    booked = Booking.objects.filter(status__in=ACTIVE_BOOKING_STATUSES).values_list(
+        'lawyer_id', 'scheduled_at', 'duration_minutes',
+    )
+    for lawyer_id, scheduled_at, duration in booked.iterator():
+        for day, mask in interval_masks(scheduled_at, duration).items():
+            masks[lawyer_id, day] |= mask
+    LawyerDayOccupancy.objects.all().delete()
+    LawyerDayOccupancy.objects.bulk_create(
+        [LawyerDayOccupancy(lawyer_id=lawyer_id, date=day, blocks=to_bytes(mask))
+         for (lawyer_id, day), mask in masks.items()],
+        batch_size=1000,
+    )
+    return len(masks)
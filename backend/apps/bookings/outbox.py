@@ -0,0 +1,166 @@
+"""Transactional notification outbox.
+
+Booking views no longer talk to the SMS provider. They call `queue_*` inside
+the transaction that changes the booking, which writes NotificationOutbox
+rows that commit or roll back with it. `manage.py dispatch_notifications`
+then delivers them in batches:
+
+- `claim_batch` takes due rows with SELECT ... FOR UPDATE SKIP LOCKED where
+  the database supports it (PostgreSQL), so several workers never pick the
+  same row; elsewhere (SQLite) a single conditional UPDATE stamps the rows
+  with the worker's claim token. A claim is a lease: `available_at` moves
+  LEASE_SECONDS ahead, so rows of a crashed worker become due again.
+- claimed rows go to the SMS backend (apps/otp/sms.py) in batches as large
+  as the provider accepts.
+- a failed delivery is retried with jittered exponential backoff until
+  MAX_ATTEMPTS, after which the row is marked failed.
+"""
+import random
+import uuid
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import NotificationOutbox
+
+BATCH_SIZE = 50
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+# ── Messages ──────────────────────────────────────────
+
+def booking_sms_messages(booking):
+    """{'customer': (phone, text), 'lawyer': (phone, text)} confirming a new booking."""
+    code = str(booking.id).split('-')[0].upper()
+    lawyer_user = booking.lawyer.user
+    customer_user = booking.customer
+    lawyer_display = f"{lawyer_user.first_name} {lawyer_user.last_name}".strip() or lawyer_user.full_name
+    customer_display = customer_user.full_name
+    local_scheduled = timezone.localtime(booking.scheduled_at)
+    date_text = local_scheduled.strftime('%Y-%m-%d')
+    time_text = local_scheduled.strftime('%H:%M')
+    session_type = 'تلفنی' if 'تلفنی' in (booking.description or booking.subject or '') else 'حضوری'
+
+    customer_message = (
+        f"کاربر گرامی رزرو وقت {session_type} شما با جناب آقای {lawyer_display} "
+        f"در تاریخ {date_text} ساعت {time_text} به کد {code} ثبت شد"
+    )
+    lawyer_message = (
+        f"وکیل گرامی، وقت {session_type} شما با {customer_display} "
+        f"در تاریخ {date_text} ساعت {time_text} به کد {code} رزرو شد"
+    )
+    return {
+        'customer': (customer_user.phone, customer_message),
+        'lawyer': (lawyer_user.phone, lawyer_message),
+    }
+
+
+def cancel_sms_messages(booking, refund_payload):
+    return {
+        'customer': (booking.customer.phone, refund_payload['message']),
+        'lawyer': (booking.lawyer.user.phone, f'رزرو {booking.subject} لغو شد.'),
+    }
+
+
+def sms_response(messages):
+    """The `sms` block of a booking response: what was queued for whom."""
+    return {
+        role: {'phone': phone, 'message': text, 'sent': False, 'queued': True}
+        for role, (phone, text) in messages.items()
+    }
+
+
+# ── Producing ─────────────────────────────────────────
+
+def queue_sms(messages, kind, booking=None):
+    """Write one outbox row per (phone, text); call inside the transaction that changes `booking`."""
+    NotificationOutbox.objects.bulk_create([
+        NotificationOutbox(channel='sms', kind=kind, recipient=phone, message=text, booking=booking)
+        for phone, text in messages.values() if phone
+    ])
+
+
+def queue_booking_created(booking):
+    queue_sms(booking_sms_messages(booking), 'booking_created', booking)
+
+
+def queue_booking_cancelled(booking, refund_payload):
+    queue_sms(cancel_sms_messages(booking, refund_payload), 'booking_cancelled', booking)
+
+
+# ── Consuming ─────────────────────────────────────────
+
+def _due(now):
+    return NotificationOutbox.objects.filter(status='pending', available_at__lte=now).order_by('available_at', 'id')
+
+
+def claim_batch(limit=BATCH_SIZE):
+    """Lease up to `limit` due rows to this worker and return them."""
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    lease = {'claim_token': token, 'available_at': now + timedelta(seconds=LEASE_SECONDS), 'attempts': F('attempts') + 1}
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            ids = list(_due(now).select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            NotificationOutbox.objects.filter(id__in=ids).update(**lease)
+        else:
+            # One UPDATE is atomic on SQLite; the status/available_at guard makes it a compare-and-set.
+            ids = _due(now).values('id')[:limit]
+            NotificationOutbox.objects.filter(id__in=ids, status='pending', available_at__lte=now).update(**lease)
+    return list(NotificationOutbox.objects.filter(claim_token=token, status='pending'))
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def deliver(notifications):
+    """Hand claimed messages to the SMS backend, up to its batch size per call.
+
+    Yields (notification, error) with error None for a delivered message.
+    """
+    from apps.otp.sms import get_backend
+
+    backend = get_backend()
+    for start in range(0, len(notifications), backend.max_batch):
+        chunk = notifications[start:start + backend.max_batch]
+        try:
+            errors = backend.send_many([(n.recipient, n.message) for n in chunk])
+        except Exception as exc:
+            errors = [exc] * len(chunk)
+        yield from zip(chunk, errors)
+
+
+def mark_sent(notification):
+    notification.status = 'sent'
+    notification.sent_at = timezone.now()
+    notification.last_error = ''
+    notification.save(update_fields=['status', 'sent_at', 'last_error'])
+
+
+def mark_failed(notification, error):
+    notification.last_error = str(error)[:1000]
+    if notification.attempts >= MAX_ATTEMPTS:
+        notification.status = 'failed'
+    else:
+        notification.available_at = timezone.now() + backoff(notification.attempts)
+    notification.save(update_fields=['status', 'available_at', 'last_error'])
+
+
+def dispatch_batch(limit=BATCH_SIZE):
+    """Claim and deliver one batch. Returns (sent, failed)."""
+    sent = failed = 0
+    for notification, error in deliver(claim_batch(limit)):
+        if error is None:
+            mark_sent(notification)
+            sent += 1
+        else:
+            mark_failed(notification, error)
+            failed += 1
+    return sent, failed
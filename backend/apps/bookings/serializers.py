@@ -4,6 +4,7 @@ from django.utils import timezone
 from datetime import timedelta
 from .models import Booking, BookingDocument, BookingCancellationLog
 from apps.lawyers.serializers import LawyerListSerializer
+from apps.lawyers.sparse import SparseFieldsMixin
 from apps.accounts.serializers import UserSerializer
 
 
@@ -43,10 +44,10 @@ class UploadDocumentSerializer(serializers.Serializer):
         return value
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.full_name', read_only=True)
     lawyer_name = serializers.CharField(source='lawyer.user.full_name', read_only=True)
-    lawyer_id = serializers.UUIDField(source='lawyer.id', read_only=True)
+    lawyer_id = serializers.UUIDField(read_only=True)  # the FK column, so no lawyer join is needed
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     type_display = serializers.CharField(source='get_booking_type_display', read_only=True)
     scheduled_at_display = serializers.SerializerMethodField()
@@ -109,12 +110,8 @@ class CreateBookingSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError({'scheduled_at': 'رزرو فقط از ۳ روز بعد امکان‌پذیر است.'})
 
         if lawyer and scheduled_at:
-            exists = Booking.objects.filter(
-                lawyer=lawyer,
-                scheduled_at=scheduled_at,
-                status__in=['pending', 'confirmed'],
-            ).exists()
-            if exists:
+            from .occupancy import conflicts
+            if conflicts(lawyer.id, scheduled_at, duration):
                 raise serializers.ValidationError({'scheduled_at': 'این ساعت قبلاً رزرو شده است.'})
 
         return attrs
@@ -0,0 +1,118 @@
+"""Slot generation on integer minute intervals.
+
+A day is the range [0, 1440) of minutes. Bookings become [start, start +
+duration) intervals that are sorted and merged once, so checking a candidate
+slot is a single `bisect` (or one vectorized `searchsorted` over all slots
+when numpy is installed) instead of a scan over every booking. Overlaps are
+checked against the whole booking duration, not just its start time.
+
+Times follow the convention of available_slots: naive wall-clock datetimes
+(`scheduled_at.replace(tzinfo=None)`).
+"""
+from bisect import bisect_right
+from datetime import datetime, time
+
+try:
+    import numpy as np
+except ImportError:  # optional: bisect per slot is already O(log n)
+    np = None
+
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_SLOT_MINUTES = 60
+# Below this many slots the numpy call overhead outweighs the vectorized check.
+VECTORIZE_MIN_SLOTS = 64
+
+
+def to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def booked_intervals(bookings, day):
+    """Merged, sorted [start, end) minute intervals of `day` covered by `bookings`.
+
+    `bookings` are (naive datetime, duration_minutes) pairs; intervals that
+    spill over midnight are clipped to the day.
+    """
+    midnight = datetime.combine(day, datetime.min.time())
+    raw = []
+    for scheduled_at, duration in bookings:
+        start = int((scheduled_at - midnight).total_seconds() // 60)
+        end = start + (duration or DEFAULT_SLOT_MINUTES)
+        start, end = max(start, 0), min(end, MINUTES_PER_DAY)
+        if start < end:
+            raw.append((start, end))
+    raw.sort()
+
+    merged = []
+    for start, end in raw:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def slot_starts(avails):
+    """(start minute, duration) of every candidate slot of the open availability rows, in order."""
+    starts = []
+    for avail in sorted(avails, key=lambda a: a.start_time):
+        duration = avail.slot_duration_minutes or DEFAULT_SLOT_MINUTES
+        last_start = to_minutes(avail.end_time) - duration
+        starts += [(minute, duration) for minute in range(to_minutes(avail.start_time), last_start + 1, duration)]
+    return starts
+
+
+def booked_flags(slots, intervals):
+    """True for every (start, duration) slot that overlaps one of the merged `intervals`."""
+    if not intervals:
+        return [False] * len(slots)
+    interval_starts = [start for start, _ in intervals]
+    interval_ends = [end for _, end in intervals]
+
+    if np is not None and len(slots) >= VECTORIZE_MIN_SLOTS:
+        starts = np.fromiter((s for s, _ in slots), dtype=np.int32, count=len(slots))
+        ends = starts + np.fromiter((d for _, d in slots), dtype=np.int32, count=len(slots))
+        # First interval ending after the slot starts; it overlaps iff it also starts before the slot ends.
+        i = np.searchsorted(np.asarray(interval_ends), starts, side='right')
+        inside = i < len(intervals)
+        hit = np.zeros(len(slots), dtype=bool)
+        hit[inside] = np.asarray(interval_starts)[i[inside]] < ends[inside]
+        return hit.tolist()
+
+    flags = []
+    for start, duration in slots:
+        i = bisect_right(interval_ends, start)
+        flags.append(i < len(intervals) and interval_starts[i] < start + duration)
+    return flags
+
+
+def day_slots(day, avails, bookings):
+    """available_slots payload for one day: every slot of `avails`, flagged when a booking overlaps it."""
+    return render_slots(day, avails, booked_intervals(bookings, day))
+
+
+def render_slots(day, avails, intervals):
+    """day_slots for already merged booked `intervals` (e.g. from an occupancy bitmap)."""
+    slots = slot_starts(avails)
+    flags = booked_flags(slots, intervals)
+    day_iso = day.isoformat()
+    payload = []
+    for (start, duration), is_booked in zip(slots, flags):
+        hhmm = f'{start // 60:02d}:{start % 60:02d}'
+        payload.append({
+            'time': hhmm,
+            'datetime': f'{day_iso}T{hhmm}:00',
+            'available': not is_booked,
+            'is_booked': is_booked,
+            'duration_minutes': duration,
+        })
+    return payload
+
+
+def first_free(day, avails, bookings):
+    """Time of the first slot of `day` no booking overlaps, or None."""
+    slots = slot_starts(avails)
+    for (start, _), is_booked in zip(slots, booked_flags(slots, booked_intervals(bookings, day))):
+        if not is_booked:
+            return time(start // 60, start % 60)
+    return None
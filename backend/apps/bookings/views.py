@@ -3,16 +3,21 @@ from rest_framework.decorators import api_view, permission_classes, parser_class
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
+from .creation import create_booking, update_booking
+from .idempotency import idempotent
 from .models import Booking, BookingDocument, BookingCancellationLog
+from .outbox import booking_sms_messages, queue_booking_cancelled, sms_response
 from .serializers import (
-    BookingSerializer, CreateBookingSerializer,
+    BookingSerializer,
     LawyerBookingUpdateSerializer, UploadDocumentSerializer,
     BookingDocumentSerializer,
 )
 from apps.lawyers.permissions import IsLawyer, IsCustomer
+from apps.lawyers.sparse import wants
 
 
 
@@ -46,43 +51,6 @@ def _booking_invoice_payload(booking, request=None):
     }
 
 
-def _send_booking_sms(booking):
-    """Send/print booking confirmation SMS to customer and lawyer.
-
-    Replace the print block with your SMS provider call in production.
-    """
-    code = str(booking.id).split('-')[0].upper()
-    lawyer_user = booking.lawyer.user
-    customer_user = booking.customer
-    lawyer_display = f"{lawyer_user.first_name} {lawyer_user.last_name}".strip() or lawyer_user.full_name
-    customer_display = customer_user.full_name
-    local_scheduled = timezone.localtime(booking.scheduled_at)
-    date_text = local_scheduled.strftime('%Y-%m-%d')
-    time_text = local_scheduled.strftime('%H:%M')
-    session_type = 'تلفنی' if 'تلفنی' in (booking.description or booking.subject or '') else 'حضوری'
-
-    customer_message = (
-        f"کاربر گرامی رزرو وقت {session_type} شما با جناب آقای {lawyer_display} "
-        f"در تاریخ {date_text} ساعت {time_text} به کد {code} ثبت شد"
-    )
-    lawyer_message = (
-        f"وکیل گرامی، وقت {session_type} شما با {customer_display} "
-        f"در تاریخ {date_text} ساعت {time_text} به کد {code} رزرو شد"
-    )
-
-    # Development fallback: print SMS in backend terminal.
-    print("=" * 60)
-    print(f"LEXARA BOOKING SMS -> CUSTOMER {customer_user.phone}")
-    print(customer_message)
-    print(f"LEXARA BOOKING SMS -> LAWYER {lawyer_user.phone}")
-    print(lawyer_message)
-    print("=" * 60)
-
-    return {
-        'customer': {'phone': customer_user.phone, 'message': customer_message, 'sent': True},
-        'lawyer': {'phone': lawyer_user.phone, 'message': lawyer_message, 'sent': True},
-    }
-
 # ─── Customer Views ────────────────────────────────────────────────────────────
 
 
@@ -123,20 +91,27 @@ def _calculate_cancel_refund(booking):
     }
 
 
-def _send_cancel_sms_stub(booking, payload):
-    try:
-        print(f"LEXARA CANCEL SMS -> CUSTOMER {booking.customer.phone}: {payload['message']}")
-        print(f"LEXARA CANCEL SMS -> LAWYER {booking.lawyer.user.phone}: رزرو {booking.subject} لغو شد.")
-    except Exception:
-        pass
+def _booking_list_queryset(request, qs):
+    """Join/prefetch only what the requested BookingSerializer fields (?fields= / ?omit=) read."""
+    related = []
+    if wants(request, 'customer_name'):
+        related.append('customer')
+    if wants(request, 'lawyer_name'):
+        related.append('lawyer__user')
+    qs = qs.select_related(*related)
+    if wants(request, 'documents'):
+        qs = qs.prefetch_related('documents')
+    return qs
+
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def customer_bookings(request):
     if request.method == 'GET':
         if request.user.role != 'customer':
             return Response({'detail': 'Only customers can view their bookings.'}, status=403)
-        bookings = Booking.objects.filter(customer=request.user).select_related('lawyer__user').prefetch_related('documents')
+        bookings = _booking_list_queryset(request, Booking.objects.filter(customer=request.user))
         ser = BookingSerializer(bookings, many=True, context={'request': request})
         return Response(ser.data)
 
@@ -144,21 +119,15 @@ def customer_bookings(request):
     if request.user.role != 'customer':
         return Response({'detail': 'Only customers can create bookings.'}, status=403)
 
-    ser = CreateBookingSerializer(data=request.data)
-    ser.is_valid(raise_exception=True)
-    booking = ser.save(customer=request.user, status='confirmed')
-
-    # Update lawyer booking count
-    lawyer = booking.lawyer
-    lawyer.total_bookings += 1
-    lawyer.save(update_fields=['total_bookings'])
+    # Validates, locks the lawyer, bumps total_bookings and inserts in one transaction (see creation.py).
+    booking = create_booking(request.data, request.user)
 
     booking_data = BookingSerializer(booking, context={'request': request}).data
     invoice = _booking_invoice_payload(booking, request=request)
-    sms = _send_booking_sms(booking)
     booking_data['invoice'] = invoice
     booking_data['upload_notice'] = invoice.get('upload_notice')
-    booking_data['sms'] = sms
+    # Queued with the booking (creation.py); `manage.py dispatch_notifications` delivers it.
+    booking_data['sms'] = sms_response(booking_sms_messages(booking))
 
     return Response(booking_data, status=201)
 
@@ -198,7 +167,8 @@ def booking_detail(request, booking_id):
             return Response({'detail': 'Customers can only cancel bookings.'}, status=403)
 
         ser.is_valid(raise_exception=True)
-        ser.save()
+        # Re-checks the slot when a cancelled/rejected booking becomes active again (see creation.py).
+        update_booking(ser)
         return Response(BookingSerializer(booking, context={'request': request}).data)
 
     if request.method == 'DELETE':
@@ -215,6 +185,7 @@ def booking_detail(request, booking_id):
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser, JSONParser])
+@idempotent
 def booking_documents(request, booking_id):
     booking = get_object_or_404(Booking, id=booking_id)
 
@@ -277,7 +248,7 @@ def lawyer_bookings(request):
         return Response({'detail': 'Lawyer profile not found.'}, status=404)
 
     status_filter = request.query_params.get('status')
-    qs = Booking.objects.filter(lawyer=profile).select_related('customer').prefetch_related('documents').order_by('scheduled_at', 'created_at')
+    qs = _booking_list_queryset(request, Booking.objects.filter(lawyer=profile)).order_by('scheduled_at', 'created_at')
     if status_filter:
         qs = qs.filter(status=status_filter)
 
@@ -287,27 +258,84 @@ def lawyer_bookings(request):
 
 # ─── Available Slots ─────────────────────────────────────────────────────────
 
+CALENDAR_MAX_DAYS = 62
+
+
+def _calendar_payload(lawyer, first_day, last_day):
+    """Per-day status and slots for [first_day, last_day] from one availability and one occupancy query.
+
+    status is "closed" (closed by the lawyer), "unavailable" (no hours set),
+    "free" (at least one open slot) or "full".
+    """
+    from datetime import timedelta
+    from django.db.models import Q
+    from apps.lawyers.models import Availability
+    from apps.lawyers.next_slot import day_rules
+    from .occupancy import day_masks, intervals
+    from .slot_engine import render_slots
+
+    avails = list(Availability.objects.filter(lawyer=lawyer).filter(
+        Q(date__isnull=True) | Q(date__range=(first_day, last_day))
+    ))
+    masks = day_masks(lawyer.id, first_day, last_day)
+
+    days = []
+    for offset in range((last_day - first_day).days + 1):
+        day = first_day + timedelta(days=offset)
+        is_closed, rules = day_rules(avails, day)
+        slots = render_slots(day, rules, intervals(masks.get(day, 0)))
+        free_slots = sum(1 for slot in slots if slot['available'])
+        if is_closed:
+            day_status = 'closed'
+        elif not slots:
+            day_status = 'unavailable'
+        else:
+            day_status = 'free' if free_slots else 'full'
+        days.append({
+            'date': day.isoformat(),
+            'status': day_status,
+            'is_closed': is_closed,
+            'has_availability': bool(slots),
+            'free_slots': free_slots,
+            'slots': slots,
+        })
+    return {'from': first_day.isoformat(), 'to': last_day.isoformat(), 'days': days}
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def available_slots(request, lawyer_id):
-    """Return available time slots for a lawyer on a given date.
+    """Return available time slots for a lawyer on a given date, or per day with ?from=&to=.
 
     Exact date availability has priority over weekly availability.
     Closed days are returned with is_closed=True so the frontend can show them red.
     Booked slots are returned with available=False so the frontend can show them red/disabled.
     """
     from apps.lawyers.models import LawyerProfile, Availability
-    from datetime import datetime, timedelta
+    from datetime import datetime
+    from .occupancy import day_masks, intervals
+    from .slot_engine import render_slots
 
     date_str = request.query_params.get('date')
-    if not date_str:
-        return Response({'detail': 'date param required (YYYY-MM-DD).'}, status=400)
+    from_str, to_str = request.query_params.get('from'), request.query_params.get('to')
+    if not date_str and not (from_str and to_str):
+        return Response({'detail': 'date param (YYYY-MM-DD) or from/to params required.'}, status=400)
 
     try:
-        query_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        if date_str:
+            query_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        else:
+            first_day = datetime.strptime(from_str, '%Y-%m-%d').date()
+            last_day = datetime.strptime(to_str, '%Y-%m-%d').date()
     except ValueError:
         return Response({'detail': 'Invalid date format.'}, status=400)
 
+    if not date_str:
+        if last_day < first_day:
+            return Response({'detail': 'to must not be before from.'}, status=400)
+        if (last_day - first_day).days + 1 > CALENDAR_MAX_DAYS:
+            return Response({'detail': f'At most {CALENDAR_MAX_DAYS} days per request.'}, status=400)
+
     try:
         lawyer = LawyerProfile.objects.get(id=lawyer_id, verification_status='verified')
     except LawyerProfile.DoesNotExist:
@@ -316,6 +344,9 @@ def available_slots(request, lawyer_id):
     if lawyer.verification_status != 'verified':
         return Response({'detail': 'این وکیل هنوز توسط ادمین تایید نشده است.'}, status=403)
 
+    if not date_str:
+        return Response(_calendar_payload(lawyer, first_day, last_day))
+
     exact_avails = list(Availability.objects.filter(lawyer=lawyer, date=query_date).order_by('start_time'))
 
     if exact_avails:
@@ -345,34 +376,8 @@ def available_slots(request, lawyer_id):
             'message': 'برای این روز ساعت فعالی ثبت نشده است.',
         })
 
-    booked_times = list(
-        Booking.objects.filter(
-            lawyer=lawyer,
-            scheduled_at__date=query_date,
-            status__in=['pending', 'confirmed'],
-        ).values_list('scheduled_at', flat=True)
-    )
-
-    slots = []
-    for avail in avails:
-        current = datetime.combine(query_date, avail.start_time)
-        end_time = datetime.combine(query_date, avail.end_time)
-        duration_minutes = getattr(avail, 'slot_duration_minutes', 60) or 60
-        duration = timedelta(minutes=duration_minutes)
-
-        while current + duration <= end_time:
-            is_booked = any(
-                abs((bt.replace(tzinfo=None) - current).total_seconds()) < 60
-                for bt in booked_times
-            )
-            slots.append({
-                'time': current.strftime('%H:%M'),
-                'datetime': current.isoformat(),
-                'available': not is_booked,
-                'is_booked': is_booked,
-                'duration_minutes': duration_minutes,
-            })
-            current += duration
+    mask = day_masks(lawyer.id, query_date).get(query_date, 0)
+    slots = render_slots(query_date, avails, intervals(mask))
 
     return Response({
         'slots': slots,
@@ -384,6 +389,7 @@ def available_slots(request, lawyer_id):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def cancel_booking(request, booking_id):
     booking = get_object_or_404(Booking.objects.select_related('customer', 'lawyer__user'), id=booking_id)
 
@@ -408,22 +414,22 @@ def cancel_booking(request, booking_id):
     booking.refund_amount = payload['refund_amount']
     booking.cancellation_fee = payload['cancellation_fee']
     booking.refund_note = payload['message']
-    booking.save(update_fields=[
-        'status', 'cancelled_at', 'cancelled_by', 'cancellation_reason',
-        'refund_status', 'refund_amount', 'cancellation_fee', 'refund_note', 'updated_at'
-    ])
-
-    log = BookingCancellationLog.objects.create(
-        booking=booking,
-        cancelled_by=request.user,
-        reason=reason,
-        hours_before_session=payload['hours_before'],
-        refund_amount=payload['refund_amount'],
-        cancellation_fee=payload['cancellation_fee'],
-        refund_status=payload['refund_status'],
-    )
-
-    _send_cancel_sms_stub(booking, payload)
+    with transaction.atomic():
+        booking.save(update_fields=[
+            'status', 'cancelled_at', 'cancelled_by', 'cancellation_reason',
+            'refund_status', 'refund_amount', 'cancellation_fee', 'refund_note', 'updated_at'
+        ])
+
+        log = BookingCancellationLog.objects.create(
+            booking=booking,
+            cancelled_by=request.user,
+            reason=reason,
+            hours_before_session=payload['hours_before'],
+            refund_amount=payload['refund_amount'],
+            cancellation_fee=payload['cancellation_fee'],
+            refund_status=payload['refund_status'],
+        )
+        queue_booking_cancelled(booking, payload)
 
     return Response({
         'detail': 'رزرو لغو شد.',
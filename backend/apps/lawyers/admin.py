@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import LawyerProfile, PracticeArea, Education, Availability, Review
+from .cache import invalidate_lawyers
+from .ranking import refresh_rank_scores
+from .models import City, CityAlias, LawyerProfile, PracticeArea, Education, Availability, Review
 
 
 class PracticeAreaInline(admin.TabularInline):
@@ -21,7 +23,7 @@ class AvailabilityInline(admin.TabularInline):
 class LawyerProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'bar_number', 'verification_status', 'is_accepting_clients',
                     'average_rating', 'total_bookings', 'is_featured')
-    list_filter = ('verification_status', 'is_accepting_clients', 'is_featured')
+    list_filter = ('verification_status', 'is_accepting_clients', 'is_featured', 'city_ref')
     search_fields = ('user__first_name', 'user__last_name', 'bar_number')
     inlines = [PracticeAreaInline, EducationInline, AvailabilityInline]
     actions = ['verify_lawyers', 'feature_lawyers']
@@ -29,13 +31,29 @@ class LawyerProfileAdmin(admin.ModelAdmin):
     @admin.action(description='Verify selected lawyers')
     def verify_lawyers(self, request, queryset):
         queryset.update(verification_status='verified')
+        invalidate_lawyers(queryset.values_list('id', flat=True))
 
     @admin.action(description='Feature selected lawyers')
     def feature_lawyers(self, request, queryset):
         queryset.update(is_featured=True)
+        lawyer_ids = list(queryset.values_list('id', flat=True))
+        refresh_rank_scores(lawyer_ids)
+        invalidate_lawyers(lawyer_ids)
 
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
     list_display = ('lawyer', 'customer', 'rating', 'is_anonymous', 'created_at')
     list_filter = ('rating',)
+
+
+class CityAliasInline(admin.TabularInline):
+    model = CityAlias
+    extra = 1
+
+
+@admin.register(City)
+class CityAdmin(admin.ModelAdmin):
+    list_display = ('code', 'name_fa', 'name_en')
+    search_fields = ('code', 'name_fa', 'name_en', 'aliases__alias')
+    inlines = [CityAliasInline]
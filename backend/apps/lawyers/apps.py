@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class LawyersConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.lawyers'
+
+    def ready(self):
+        from . import signals  # noqa: F401
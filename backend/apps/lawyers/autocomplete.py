@@ -0,0 +1,122 @@
+"""In-process prefix index for `/api/lawyers/autocomplete/?q=`.
+
+Every worker keeps a sorted array of normalized keys (full names and each
+word of them, practice-area labels in English and Persian, city names and
+aliases) and answers a keystroke with a `bisect` plus a short forward scan,
+without touching the database.
+
+Freshness: the index has its own version in the shared cache, bumped only
+when what it holds changes: a lawyer's name, city or verification status
+(cache.invalidate_lawyers), a city or alias, or the nightly ranking. A
+worker that sees a new version keeps answering from its current arrays and
+rebuilds them in a background thread; only the very first build blocks.
+"""
+import threading
+from bisect import bisect_left
+
+from django.db import connection
+
+from .cache import autocomplete_version
+from .models import PRACTICE_AREAS, PRACTICE_AREA_FA, City, LawyerProfile
+from .text import normalize
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+MAX_SCAN = 300
+TYPE_ORDER = {'area': 0, 'city': 1, 'lawyer': 2}
+
+
+def _keys(*labels):
+    """The normalized label itself plus every word suffix, so "احم" finds "علی احمدی"."""
+    keys = set()
+    for label in labels:
+        words = normalize(label).split()
+        keys.update(' '.join(words[i:]) for i in range(len(words)))
+    keys.discard('')
+    return keys
+
+
+def _lawyer_rows(queryset):
+    rows = queryset.values_list(
+        'id', 'user__first_name', 'user__last_name', 'city_ref__name_fa', 'city', 'rank_score',
+    )
+    for lawyer_id, first_name, last_name, city_fa, city, rank in rows:
+        label = f'{first_name} {last_name}'.strip()
+        entry = {'type': 'lawyer', 'id': str(lawyer_id), 'label': label, 'city': city_fa or city or '', 'rank': rank}
+        yield from ((key, entry) for key in _keys(label))
+
+
+def _static_pairs():
+    pairs = []
+    for code, label_en in PRACTICE_AREAS:
+        label_fa = PRACTICE_AREA_FA.get(code, '')
+        entry = {'type': 'area', 'value': code, 'label': label_fa or label_en, 'label_en': label_en}
+        pairs += [(key, entry) for key in _keys(label_fa, label_en, code.replace('_', ' '))]
+    for city in City.objects.prefetch_related('aliases'):
+        entry = {'type': 'city', 'value': city.code, 'label': city.name_fa, 'label_en': city.name_en}
+        pairs += [(key, entry) for key in _keys(city.name_fa, city.name_en, *(a.alias for a in city.aliases.all()))]
+    return pairs
+
+
+class PrefixIndex:
+    def __init__(self):
+        self.lock = threading.Lock()  # held by whoever is building
+        self.version = None
+        self.arrays = None            # (sorted keys, entries), swapped as one tuple
+
+    # ── Building ──────────────────────────────────────────
+
+    def rebuild(self):
+        pairs = list(_lawyer_rows(LawyerProfile.objects.filter(verification_status='verified'))) + _static_pairs()
+        pairs.sort(key=lambda pair: pair[0])
+        # Readers grab (keys, entries) in one attribute read, so they never see half an update.
+        self.arrays = ([k for k, _ in pairs], [e for _, e in pairs])
+
+    def ensure_fresh(self):
+        version = autocomplete_version()
+        if version == self.version:
+            return
+        if self.arrays is None:
+            with self.lock:
+                if self.arrays is None:
+                    self.rebuild()
+                    self.version = version
+            return
+        if self.lock.acquire(blocking=False):
+            threading.Thread(target=self._rebuild_in_background, args=(version,), daemon=True).start()
+
+    def _rebuild_in_background(self, version):
+        try:
+            self.rebuild()
+            self.version = version
+        finally:
+            self.lock.release()
+            connection.close()  # this thread's own connection
+
+    # ── Querying ──────────────────────────────────────────
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        keys, entries = self.arrays
+        seen, results = set(), []
+        i = bisect_left(keys, prefix)
+        end = min(len(keys), i + MAX_SCAN)
+        while i < end and keys[i].startswith(prefix):
+            entry = entries[i]
+            ident = (entry['type'], entry.get('id') or entry.get('value'))
+            if ident not in seen:
+                seen.add(ident)
+                results.append(entry)
+            i += 1
+        results.sort(key=lambda e: (TYPE_ORDER[e['type']], -(e.get('rank') or 0)))
+        return [{k: v for k, v in e.items() if k != 'rank'} for e in results[:limit]]
+
+
+_index = PrefixIndex()
+
+
+def autocomplete(query, limit=DEFAULT_LIMIT):
+    _index.ensure_fresh()
+    return _index.search(query, min(max(limit, 1), MAX_LIMIT))
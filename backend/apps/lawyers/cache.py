@@ -0,0 +1,191 @@
+"""Response cache for the public lawyer directory.
+
+Cache keys embed version counters instead of being deleted one by one:
+each lawyer's detail responses are keyed by a per-lawyer version (also the
+ETag source), and list pages and facets by a directory version. Both live in
+the cache only, so invalidating never writes to the database and never
+touches `updated_at`. signals.py calls invalidate_lawyers after commit whenever a
+profile, practice area, availability, review or booking of a lawyer changes:
+that always bumps the lawyer's own detail version, but the directory version
+only when something list rows, filters or ordering read has changed. That is
+checked against a digest of each lawyer's listed columns kept in the cache,
+so a booking that leaves counts, rank and next slot alone costs no list page.
+The same digest carries the labels the autocomplete index holds, which has a
+version of its own for the same reason.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .geo import near_key
+from .models import LawyerProfile
+from .pagination import KeysetPagination
+from .sparse import fieldset_key
+from .text import normalize
+
+DIRECTORY_VERSION_KEY = 'lawyers:directory-version'
+LAWYER_VERSION_KEY = 'lawyers:content-version:{id}'
+AUTOCOMPLETE_VERSION_KEY = 'lawyers:autocomplete-version'
+LISTED_STATE_KEY = 'lawyers:listed-state:{id}'
+# Profile columns no list row, filter or ordering reads.
+UNLISTED_COLUMNS = {'updated_at', 'next_slot_refreshed_on'}
+LISTED_USER_FIELDS = ('user__first_name', 'user__last_name', 'user__avatar')
+# What the autocomplete index holds per lawyer (see autocomplete.py).
+INDEXED_LABEL_FIELDS = ('user__first_name', 'user__last_name', 'city', 'city_ref_id', 'verification_status')
+METRIC_KEY = 'lawyers:cache-metric:{kind}:{result}'
+METRIC_KINDS = ('list', 'detail', 'facets')
+
+
+def _ttl():
+    return getattr(settings, 'LAWYER_CACHE_TTL', 300)
+
+
+def _fresh_version():
+    # Time based, so a version key that was evicted never restarts at a value old entries still use.
+    return int(time.time() * 1000)
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _fresh_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _fresh_version(), None)
+
+
+def invalidate_lawyers(lawyer_ids):
+    """Bump the detail version of each lawyer; the directory version if any of them
+    now lists differently (or was deleted), and the autocomplete version if any
+    name, city or verification status changed."""
+    lawyer_ids = [LawyerProfile._meta.pk.to_python(lawyer_id) for lawyer_id in lawyer_ids]
+    if not lawyer_ids:
+        return
+    for lawyer_id in lawyer_ids:
+        _bump(LAWYER_VERSION_KEY.format(id=lawyer_id))
+    listing_changed, labels_changed = _listed_state_changed(lawyer_ids)
+    if listing_changed:
+        _bump(DIRECTORY_VERSION_KEY)
+    if labels_changed:
+        _bump(AUTOCOMPLETE_VERSION_KEY)
+
+
+def _digest(values):
+    return hashlib.md5(repr(values).encode()).hexdigest()
+
+
+def _listed_state(lawyer_ids):
+    """{lawyer id: (digest of what the directory shows, filters or orders by, digest of the indexed labels)}."""
+    columns = [f.attname for f in LawyerProfile._meta.concrete_fields if f.attname not in UNLISTED_COLUMNS]
+    rows = LawyerProfile.objects.filter(id__in=lawyer_ids).values(*columns, *LISTED_USER_FIELDS)
+    return {
+        row['id']: (_digest(list(row.values())), _digest([row[name] for name in INDEXED_LABEL_FIELDS]))
+        for row in rows
+    }
+
+
+def _listed_state_changed(lawyer_ids):
+    """Store the listed state of `lawyer_ids`; (listing changed, labels changed) for any of them.
+
+    A lawyer whose previous state is unknown (first change, evicted key) or who is gone counts as changed.
+    """
+    keys = {lawyer_id: LISTED_STATE_KEY.format(id=lawyer_id) for lawyer_id in lawyer_ids}
+    stored = cache.get_many(list(keys.values()))
+    current = _listed_state(lawyer_ids)
+    listing_changed = labels_changed = False
+    for lawyer_id, key in keys.items():
+        before, now = stored.get(key) or (None, None), current.get(lawyer_id) or (None, None)
+        listing_changed |= now[0] is None or before[0] != now[0]
+        labels_changed |= now[1] is None or before[1] != now[1]
+    cache.set_many({keys[lawyer_id]: state for lawyer_id, state in current.items()}, None)
+    cache.delete_many([key for lawyer_id, key in keys.items() if lawyer_id not in current])
+    return listing_changed, labels_changed
+
+
+def lawyer_version(lawyer_id):
+    """Changes whenever anything shown on the lawyer's profile page changes."""
+    return _get_version(LAWYER_VERSION_KEY.format(id=lawyer_id))
+
+
+def invalidate_directory():
+    _bump(DIRECTORY_VERSION_KEY)
+
+
+def invalidate_autocomplete():
+    _bump(AUTOCOMPLETE_VERSION_KEY)
+
+
+def autocomplete_version():
+    """Changes when a lawyer's name, city or verification, a city, or the ranking changes."""
+    return _get_version(AUTOCOMPLETE_VERSION_KEY)
+
+
+# Params that change the response by being present at all: an empty ?cursor= switches to keyset pages.
+PRESENCE_PARAMS = {KeysetPagination.cursor_query_param}
+
+
+def _normalized_params(request):
+    params = []
+    for name in sorted(request.query_params):
+        value = request.query_params.get(name, '').strip()
+        if not value and name not in PRESENCE_PARAMS:
+            continue
+        if name == 'search':
+            value = normalize(value)
+        params.append((name, value))
+    return urlencode(params)
+
+
+def list_cache_key(request, kind='list'):
+    raw = f'{request.get_host()}|{timezone.localdate()}|{_normalized_params(request)}'
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'lawyers:{kind}:{_get_version(DIRECTORY_VERSION_KEY)}:{digest}'
+
+
+def detail_cache_key(request, lawyer_id, version):
+    # distance_km depends on ?near=.
+    raw = f'{request.get_host()}|{timezone.localdate()}|{fieldset_key(request)}|{near_key(request)}'
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'lawyers:detail:{lawyer_id}:{version}:{digest}'
+
+
+def get_cached(kind, key):
+    data = cache.get(key)
+    _record(kind, 'hit' if data is not None else 'miss')
+    return data
+
+
+def set_cached(key, data):
+    cache.set(key, data, _ttl())
+
+
+def _record(kind, result):
+    key = METRIC_KEY.format(kind=kind, result=result)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def cache_stats():
+    stats = {}
+    for kind in METRIC_KINDS:
+        hits = cache.get(METRIC_KEY.format(kind=kind, result='hit'), 0)
+        misses = cache.get(METRIC_KEY.format(kind=kind, result='miss'), 0)
+        total = hits + misses
+        stats[kind] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0,
+        }
+    return stats
@@ -0,0 +1,116 @@
+"""Canonical city lookup.
+
+Free-text `city` / `office_address` values are resolved to a `City` code
+through its normalized aliases, so city filters and facets become an indexed
+`city_ref_id = code` equality instead of icontains scans. The alias table is
+small and rarely edited, so it is held in process memory and reloaded when a
+City/CityAlias changes here (signals.py) or after CITY_CACHE_SECONDS.
+"""
+import re
+import time
+
+from django.db.models import Count, Q
+
+from .models import City, CityAlias, LawyerTrigram
+from .text import normalize, trigrams
+
+CITY_CACHE_SECONDS = 300
+_PUNCTUATION_RE = re.compile(r'[^\w ]+', re.UNICODE)
+_SEGMENT_RE = re.compile(r'[،,؛;\-–\n]+')
+
+_state = {'loaded_at': None, 'aliases': {}, 'ordered': [], 'names': {}}
+
+
+def clear_city_cache():
+    _state['loaded_at'] = None
+
+
+def _load():
+    loaded_at = _state['loaded_at']
+    if loaded_at is not None and time.monotonic() - loaded_at < CITY_CACHE_SECONDS:
+        return _state
+    cities = list(City.objects.values_list('code', 'name_fa', 'name_en'))
+    _state.update(
+        alias_index(cities, CityAlias.objects.values_list('alias', 'city_id')),
+        names={code: (name_fa, name_en) for code, name_fa, name_en in cities},
+        loaded_at=time.monotonic(),
+    )
+    return _state
+
+
+def alias_index(city_rows, alias_rows):
+    """{'aliases': {alias: code}, 'ordered': [...]} from (code, name_fa, name_en) and (alias, code) rows."""
+    aliases = {normalize(name): code for code, *pair in city_rows for name in pair}
+    aliases.update(alias_rows)
+    # Longest first so "بندر عباس" wins over a shorter alias inside it.
+    return {'aliases': aliases, 'ordered': sorted(aliases.items(), key=lambda item: -len(item[0]))}
+
+
+def match_city(index, texts):
+    """resolve_city against an explicit alias_index (e.g. built from migration models)."""
+    for text in texts:
+        value = normalize(text)
+        if not value:
+            continue
+        if value in index['aliases']:
+            return index['aliases'][value]
+        # Addresses name the city in a segment of its own, usually the last one
+        # ("خیابان کرمانشاه، تهران"); a street named after another city must not win.
+        segments = [normalize(segment) for segment in _SEGMENT_RE.split(value)]
+        for segment in reversed(segments):
+            if segment in index['aliases']:
+                return index['aliases'][segment]
+        code = _last_alias(index, value)
+        if code:
+            return code
+    return None
+
+
+def _last_alias(index, value):
+    """Code of the alias that ends last in `value` (longest on a tie), as whole words."""
+    padded = f" {_PUNCTUATION_RE.sub(' ', value)} "
+    best, best_end = None, -1
+    for alias, code in index['ordered']:
+        end = padded.rfind(f' {alias} ')
+        if end >= 0:
+            end += len(alias)
+            if end > best_end:
+                best, best_end = code, end
+    return best
+
+
+def resolve_city(*texts):
+    """Code of the city named in the first of `texts` that names one, else None.
+
+    A text is first looked up as a whole (the `city` field), then per comma
+    separated segment from the end, then scanned for the alias that appears
+    last as whole words (free-form addresses and Justive questions).
+    """
+    return match_city(_load(), texts)
+
+
+def city_name(code, lang='fa'):
+    names = _load()['names'].get(code)
+    if not names:
+        return ''
+    return names[0] if lang == 'fa' else names[1]
+
+
+def city_q(value):
+    """Filter for `?city=` given a code or any spelling.
+
+    Known cities are an indexed equality on city_ref; towns that are not in the
+    table yet stay findable through the lawyers' indexed trigrams, which cover
+    the normalized `city` field: every trigram of the town must be present.
+    """
+    code = value if value in _load()['names'] else resolve_city(value)
+    if code:
+        return Q(city_ref_id=code)
+    grams = trigrams(value)
+    if not grams:
+        return Q(pk__in=[])
+    lawyers = (
+        LawyerTrigram.objects.filter(trigram__in=grams)
+        .values('lawyer_id').annotate(hits=Count('id')).filter(hits=len(grams))
+    )
+    return Q(id__in=lawyers.values('lawyer_id'))
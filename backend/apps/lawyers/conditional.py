@@ -0,0 +1,43 @@
+"""Conditional GET: strong ETags / Last-Modified and early 304 responses.
+
+Views compute validators from cheap metadata (a cached version, a max
+updated_at, or the hash of an already cached body) and call `not_modified`
+before doing any serializer work.
+"""
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5('|'.join(str(p) for p in parts).encode()).hexdigest())
+
+
+def body_etag(data):
+    body = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return quote_etag(hashlib.md5(body.encode()).hexdigest())
+
+
+def _timestamp(last_modified):
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def not_modified(request, etag=None, last_modified=None, vary=None):
+    """A 304 response when the client's If-None-Match / If-Modified-Since still hold, else None."""
+    response = get_conditional_response(request, etag=etag, last_modified=_timestamp(last_modified))
+    if response is not None:
+        set_validators(response, etag, last_modified, vary)
+    return response
+
+
+def set_validators(response, etag=None, last_modified=None, vary=None):
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(_timestamp(last_modified))
+    if vary:
+        patch_vary_headers(response, vary)
+    return response
@@ -0,0 +1,93 @@
+"""Facet counts for the lawyer filter sidebar.
+
+Everything is computed from the filtered queryset in two grouped queries:
+one grouped by canonical city (city_ref) that also carries the fee, rating
+and accepting counts as conditional aggregates (each lawyer has at most one
+city, so summing the groups is exact), and one grouped by practice area.
+"""
+from django.db.models import Count, Q
+
+from .models import PRACTICE_AREAS, PRACTICE_AREA_FA
+
+# (key, min_fee, max_fee) — matches the budgets Justive suggests.
+FEE_BUCKETS = [
+    ('lte_300000', None, 300000),
+    ('300000_500000', 300000, 500000),
+    ('500000_800000', 500000, 800000),
+    ('800000_1200000', 800000, 1200000),
+    ('gt_1200000', 1200000, None),
+]
+RATING_BUCKETS = [4, 3, 2]   # "n stars and up", same semantics as ?min_rating=
+
+
+def _fee_q(min_fee, max_fee):
+    q = Q()
+    if min_fee is not None:
+        q &= Q(consultation_fee__gt=min_fee)
+    if max_fee is not None:
+        q &= Q(consultation_fee__lte=max_fee)
+    return q
+
+
+def compute_facets(queryset):
+    queryset = queryset.order_by()
+    aggregates = {'total': Count('id', distinct=True)}
+    aggregates['accepting'] = Count('id', distinct=True, filter=Q(is_accepting_clients=True))
+    for key, min_fee, max_fee in FEE_BUCKETS:
+        aggregates[f'fee_{key}'] = Count('id', distinct=True, filter=_fee_q(min_fee, max_fee))
+    for stars in RATING_BUCKETS:
+        aggregates[f'rating_{stars}'] = Count('id', distinct=True, filter=Q(average_rating__gte=stars))
+
+    totals = {name: 0 for name in aggregates}
+    cities = []
+    rows = queryset.values('city_ref_id', 'city_ref__name_fa', 'city_ref__name_en').annotate(**aggregates)
+    for row in rows.order_by('-total'):
+        for name in aggregates:
+            totals[name] += row[name]
+        if row['city_ref_id']:
+            cities.append({
+                'value': row['city_ref_id'],
+                'label': row['city_ref__name_fa'],
+                'label_en': row['city_ref__name_en'],
+                'count': row['total'],
+            })
+
+    area_labels = dict(PRACTICE_AREAS)
+    areas = [
+        {
+            'value': row['practice_areas__area'],
+            'label': area_labels.get(row['practice_areas__area'], row['practice_areas__area']),
+            'label_fa': PRACTICE_AREA_FA.get(row['practice_areas__area'], ''),
+            'count': row['count'],
+        }
+        for row in (
+            queryset.exclude(practice_areas__area=None)
+            .values('practice_areas__area')
+            .annotate(count=Count('id', distinct=True))
+            .order_by('-count')
+        )
+    ]
+
+    return {
+        'total': totals['total'],
+        'practice_areas': areas,
+        'cities': cities,
+        # Buckets are (min, max]; fees are whole rials so ?min_fee=min+1 selects exactly the bucket.
+        'fee': [
+            {
+                'value': key,
+                'min_fee': min_fee + 1 if min_fee is not None else None,
+                'max_fee': max_fee,
+                'count': totals[f'fee_{key}'],
+            }
+            for key, min_fee, max_fee in FEE_BUCKETS
+        ],
+        'rating': [
+            {'value': stars, 'min_rating': stars, 'count': totals[f'rating_{stars}']}
+            for stars in RATING_BUCKETS
+        ],
+        'accepting': {
+            'true': totals['accepting'],
+            'false': totals['total'] - totals['accepting'],
+        },
+    }
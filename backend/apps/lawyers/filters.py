@@ -1,6 +1,14 @@
 import django_filters
-from django.db import models
+from rest_framework import filters
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from .cities import city_q
+from .free_slots import filter_free
+from .geo import nearest_ids, parse_near, parse_radius
+from .languages import filter_languages
 from .models import LawyerProfile
+from .search import search_queryset
+from .utils import order_by_ids
 
 
 class LawyerFilter(django_filters.FilterSet):
@@ -12,12 +20,72 @@ class LawyerFilter(django_filters.FilterSet):
     min_experience = django_filters.NumberFilter(field_name='years_experience', lookup_expr='gte')
     min_rating = django_filters.NumberFilter(field_name='average_rating', lookup_expr='gte')
     accepting = django_filters.BooleanFilter(field_name='is_accepting_clients')
-    language = django_filters.CharFilter(field_name='languages', lookup_expr='icontains')
+    # ?language=fa,en matches any of them; add ?language_mode=all to require every one.
+    language = django_filters.CharFilter(method='filter_language')
+    language_mode = django_filters.ChoiceFilter(choices=[('any', 'any'), ('all', 'all')], method='filter_noop')
     city = django_filters.CharFilter(method='filter_city')
+    # ?near=35.7,51.4&radius_km=5 keeps lawyers within the radius and orders them nearest first.
+    near = django_filters.CharFilter(method='filter_near')
+    radius_km = django_filters.NumberFilter(method='filter_noop')
+    # ?available_on=2025-01-16&available_at=17:00 keeps lawyers with a free slot then (available_at alone means today).
+    available_on = django_filters.DateFilter(method='filter_available')
+    available_at = django_filters.TimeFilter(method='filter_available')
+
+    def filter_near(self, queryset, name, value):
+        point = parse_near(value)
+        if point is None:
+            raise ValidationError({'near': ['فرمت موقعیت باید lat,lng باشد.']})
+        ids = nearest_ids(queryset, *point, parse_radius(self.data.get('radius_km')))
+        return order_by_ids(queryset, ids, annotation='distance_position')
+
+    def filter_available(self, queryset, name, value):
+        day = self.form.cleaned_data.get('available_on')
+        if name == 'available_at' and day:
+            return queryset  # applied together with available_on
+        return filter_free(queryset, day or timezone.localdate(), self.form.cleaned_data.get('available_at'))
 
     def filter_city(self, queryset, name, value):
-        return queryset.filter(models.Q(city__icontains=value) | models.Q(office_address__icontains=value))
+        return queryset.filter(city_q(value))
+
+    def filter_language(self, queryset, name, value):
+        return filter_languages(queryset, value, mode=self.data.get('language_mode') or 'any')
+
+    def filter_noop(self, queryset, name, value):
+        return queryset
 
     class Meta:
         model = LawyerProfile
         fields = ['area', 'city', 'min_rate', 'max_rate', 'min_fee', 'max_fee', 'min_experience', 'min_rating', 'accepting']
+
+
+class LawyerSearchFilter(filters.SearchFilter):
+    """`?search=` backed by the full-text index. Annotates `search_position` (lower = more relevant)."""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_queryset(queryset, query)
+
+
+class LawyerOrderingFilter(filters.OrderingFilter):
+    """Orders search results by relevance and ?near= results by distance unless the
+    client asked for an explicit ordering (`?ordering=distance` is accepted with ?near=).
+
+    `id` is always appended so pages (and keyset cursors) have a total order.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        annotations = queryset.query.annotations
+        if params == 'distance' and 'distance_position' in annotations:
+            ordering = ['distance_position']
+        elif not params and 'search_position' in annotations:
+            ordering = ['search_position']
+        elif not params and 'distance_position' in annotations:
+            ordering = ['distance_position']
+        else:
+            ordering = list(super().get_ordering(request, queryset, view) or [])
+        if 'id' not in ordering:
+            ordering.append('id')
+        return ordering
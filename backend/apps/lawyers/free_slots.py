@@ -0,0 +1,103 @@
+"""Set-based "who is free" filter for `?available_on=YYYY-MM-DD&available_at=HH:MM`.
+
+Everything is a correlated subquery over Availability and Booking, so the
+filter composes with the rest of LawyerFilter, ordering and pagination
+without looping over lawyers. Times are integer minutes of the day (ExtractHour/
+ExtractMinute cast to integer), the same model as apps/bookings/slot_engine.py:
+a rule yields slots [start + k*d, start + (k+1)*d) and a booking
+[b, b + duration) blocks every slot it overlaps.
+"""
+from django.db.models import Exists, ExpressionWrapper, F, IntegerField, OuterRef, Value
+from django.db.models.functions import Cast, ExtractHour, ExtractMinute, Mod
+
+from .models import Availability
+from .next_slot import ACTIVE_BOOKING_STATUSES, DAY_ABBRS
+from .utils import day_bounds
+
+
+def _minutes(field):
+    # EXTRACT is numeric/double on PostgreSQL; the slot arithmetic relies on integer division.
+    return Cast(ExtractHour(field) * 60 + ExtractMinute(field), IntegerField())
+
+
+def _day_bookings(day):
+    """Active bookings of OuterRef('lawyer') on `day` with b_start / b_end in minutes."""
+    from apps.bookings.models import Booking
+
+    start, end = day_bounds(day)
+    return Booking.objects.filter(
+        lawyer=OuterRef('lawyer'),
+        scheduled_at__gte=start,
+        scheduled_at__lt=end,
+        status__in=ACTIVE_BOOKING_STATUSES,
+    ).annotate(b_start=_minutes('scheduled_at')).annotate(b_end=F('b_start') + F('duration_minutes'))
+
+
+def _rules():
+    """Open availability rows of OuterRef('pk') with start_min, slot count and slots_end in minutes."""
+    return Availability.objects.filter(lawyer=OuterRef('pk'), is_closed=False).annotate(
+        start_min=_minutes('start_time'),
+        end_min=_minutes('end_time'),
+    ).annotate(
+        slot_count=(F('end_min') - F('start_min')) / F('slot_duration_minutes'),
+    ).annotate(
+        slots_end=F('start_min') + F('slot_count') * F('slot_duration_minutes'),
+    )
+
+
+def _with_free_slot(rules, day):
+    """Rules with at least one slot no booking overlaps.
+
+    The first free slot of a rule is either its first slot or the first slot
+    starting at or after the end of some booking, so only those candidates
+    are checked.
+    """
+    duration = OuterRef('slot_duration_minutes')
+    first_slot_taken = _day_bookings(day).filter(
+        b_start__lt=OuterRef('start_min') + duration, b_end__gt=OuterRef('start_min'),
+    )
+    after_booking = _day_bookings(day).filter(b_end__gt=OuterRef('start_min')).annotate(
+        candidate=ExpressionWrapper(
+            OuterRef('start_min') + (F('b_end') - OuterRef('start_min') + duration - 1) / duration * duration,
+            output_field=IntegerField(),
+        ),
+    ).filter(candidate__lte=OuterRef('slots_end') - duration)
+    candidate_taken = _day_bookings(day).filter(
+        b_start__lt=OuterRef('candidate') + OuterRef(duration), b_end__gt=OuterRef('candidate'),
+    )
+    return rules.filter(slot_count__gt=0).filter(
+        ~Exists(first_slot_taken) | Exists(after_booking.filter(~Exists(candidate_taken)))
+    )
+
+
+def _with_slot_at(rules, day, at):
+    """Rules that have a slot starting exactly at `at` which no booking overlaps."""
+    minute = at.hour * 60 + at.minute
+    duration = OuterRef('slot_duration_minutes')
+    overlapping = _day_bookings(day).filter(b_start__lt=minute + duration, b_end__gt=minute)
+    return rules.annotate(
+        offset=Mod(Value(minute) - F('start_min'), F('slot_duration_minutes')),
+    ).filter(
+        start_min__lte=minute,
+        slots_end__gte=minute + F('slot_duration_minutes'),
+        offset=0,
+    ).filter(~Exists(overlapping))
+
+
+def filter_free(queryset, day, at=None):
+    """Lawyers with a free slot on `day` (starting at `at` when given).
+
+    Exact-date rows override the weekly rules of that day and a closed row
+    closes the whole day, as in available_slots.
+    """
+    day_rows = Availability.objects.filter(lawyer=OuterRef('pk'), date=day)
+    exact_rules = _rules().filter(date=day)
+    weekly_rules = _rules().filter(date__isnull=True, day_of_week=DAY_ABBRS[day.weekday()])
+    if at is None:
+        exact_rules, weekly_rules = _with_free_slot(exact_rules, day), _with_free_slot(weekly_rules, day)
+    else:
+        exact_rules, weekly_rules = _with_slot_at(exact_rules, day, at), _with_slot_at(weekly_rules, day, at)
+    return queryset.filter(
+        ~Exists(day_rows.filter(is_closed=True)),
+        (Exists(day_rows) & Exists(exact_rules)) | (~Exists(day_rows) & Exists(weekly_rules)),
+    )
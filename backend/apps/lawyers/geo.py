@@ -0,0 +1,87 @@
+"""Proximity search for `?near=lat,lng&radius_km=`.
+
+Candidates are pruned with a bounding box on the indexed (latitude, longitude)
+columns — plain B-tree ranges, so no PostGIS/SpatiaLite is needed — and only
+the rows inside the box get an exact haversine distance. Distances are
+computed in one vectorized pass with numpy when it is installed.
+"""
+import math
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python loop is fine for small candidate sets
+    np = None
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 200
+MAX_NEAR_RESULTS = 500
+
+
+def parse_near(value):
+    """(lat, lng) from "lat,lng", or None when malformed or out of range."""
+    try:
+        lat, lng = (float(part) for part in str(value).split(','))
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return lat, lng
+
+
+def near_key(request):
+    """Canonical ?near= point for cache keys and ETags ('' without a valid one)."""
+    point = parse_near(request.query_params.get('near'))
+    return '' if point is None else f'{point[0]!r},{point[1]!r}'
+
+
+def parse_radius(value):
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RADIUS_KM
+    return min(max(radius, 0.1), MAX_RADIUS_KM)
+
+
+def bounding_box(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng); longitude bounds are None when the box wraps a pole or ±180°."""
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), None, None
+    delta_lng = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(lat))))
+    min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    if min_lng < -180 or max_lng > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """Great-circle distances from (lat, lng) to each (lats[i], lngs[i])."""
+    if np is not None:
+        lat1, lng1 = np.radians(lat), np.radians(lng)
+        lat2, lng2 = np.radians(np.asarray(lats, dtype=float)), np.radians(np.asarray(lngs, dtype=float))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+        return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))).tolist()
+    lat1, lng1 = math.radians(lat), math.radians(lng)
+    distances = []
+    for lat2, lng2 in zip(lats, lngs):
+        lat2, lng2 = math.radians(lat2), math.radians(lng2)
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)))
+    return distances
+
+
+def nearest_ids(queryset, lat, lng, radius_km):
+    """Ids of lawyers in `queryset` within `radius_km`, nearest first (at most MAX_NEAR_RESULTS)."""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    candidates = queryset.filter(latitude__gte=min_lat, latitude__lte=max_lat)
+    if min_lng is not None:
+        candidates = candidates.filter(longitude__gte=min_lng, longitude__lte=max_lng)
+    rows = list(candidates.order_by().values_list('id', 'latitude', 'longitude'))
+    if not rows:
+        return []
+    ids, lats, lngs = zip(*rows)
+    distances = haversine_km(lat, lng, lats, lngs)
+    within = sorted((d, i) for i, d in zip(ids, distances) if d <= radius_km)
+    return [lawyer_id for _, lawyer_id in within[:MAX_NEAR_RESULTS]]
@@ -0,0 +1,77 @@
+"""Language codes for the directory's language filter.
+
+`LawyerProfile.languages` stays the free-form list the profile form edits
+(["فارسی", "English"]); each entry is mapped to a short code and mirrored
+into `LawyerLanguage` rows so `?language=` is an indexed lookup instead of
+an icontains over the serialized JSON.
+"""
+from django.db.models import Exists, OuterRef
+
+from .models import LawyerLanguage, LawyerProfile
+from .text import normalize
+
+LANGUAGE_ALIASES = {
+    'fa': ['fa', 'فارسی', 'پارسی', 'persian', 'farsi'],
+    'en': ['en', 'انگلیسی', 'english'],
+    'ar': ['ar', 'عربی', 'arabic'],
+    'tr': ['tr', 'ترکی', 'ترکی استانبولی', 'turkish'],
+    'az': ['az', 'ترکی آذری', 'آذری', 'azerbaijani', 'azeri'],
+    'ku': ['ku', 'کردی', 'kurdish'],
+    'fr': ['fr', 'فرانسوی', 'french'],
+    'de': ['de', 'آلمانی', 'german'],
+    'ru': ['ru', 'روسی', 'russian'],
+    'es': ['es', 'اسپانیایی', 'spanish'],
+    'it': ['it', 'ایتالیایی', 'italian'],
+    'zh': ['zh', 'چینی', 'chinese'],
+}
+_ALIAS_TO_CODE = {normalize(alias): code for code, aliases in LANGUAGE_ALIASES.items() for alias in aliases}
+CODE_MAX_LENGTH = 30
+
+
+def language_code(value):
+    """Short code of a language name in any listed spelling; unknown names keep their normalized text."""
+    value = normalize(value)
+    return _ALIAS_TO_CODE.get(value, value[:CODE_MAX_LENGTH])
+
+
+def language_codes(values):
+    if isinstance(values, str):
+        values = values.split(',')
+    return sorted({language_code(v) for v in values or [] if normalize(v)})
+
+
+def sync_languages(lawyer_ids):
+    """Make the LawyerLanguage rows of `lawyer_ids` match their `languages` lists."""
+    wanted = {
+        lawyer_id: set(language_codes(languages))
+        for lawyer_id, languages in LawyerProfile.objects.filter(id__in=lawyer_ids).values_list('id', 'languages')
+    }
+    existing = {}
+    for row_id, lawyer_id, code in LawyerLanguage.objects.filter(lawyer_id__in=lawyer_ids).values_list(
+        'id', 'lawyer_id', 'code'
+    ):
+        existing[(lawyer_id, code)] = row_id
+
+    stale = [row_id for (lawyer_id, code), row_id in existing.items() if code not in wanted.get(lawyer_id, ())]
+    missing = [
+        LawyerLanguage(lawyer_id=lawyer_id, code=code)
+        for lawyer_id, codes in wanted.items()
+        for code in codes
+        if (lawyer_id, code) not in existing
+    ]
+    if stale:
+        LawyerLanguage.objects.filter(id__in=stale).delete()
+    if missing:
+        LawyerLanguage.objects.bulk_create(missing, ignore_conflicts=True)
+
+
+def filter_languages(queryset, values, mode='any'):
+    """Lawyers speaking any (default) or all of `values`. One indexed EXISTS per code in `all` mode."""
+    codes = language_codes(values)
+    if not codes:
+        return queryset
+    if mode == 'all':
+        for code in codes:
+            queryset = queryset.filter(Exists(LawyerLanguage.objects.filter(lawyer=OuterRef('pk'), code=code)))
+        return queryset
+    return queryset.filter(Exists(LawyerLanguage.objects.filter(lawyer=OuterRef('pk'), code__in=codes)))
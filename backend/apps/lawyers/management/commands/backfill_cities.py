@@ -0,0 +1,35 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from apps.lawyers.cache import invalidate_lawyers
+from apps.lawyers.cities import clear_city_cache, resolve_city
+from apps.lawyers.models import LawyerProfile
+
+CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Resolve every lawyer\'s city/office_address text to a canonical city (city_ref).'
+
+    def handle(self, *args, **options):
+        clear_city_cache()
+        changed, unresolved = [], Counter()
+        profiles = LawyerProfile.objects.only('id', 'city', 'office_address', 'city_ref')
+        for profile in profiles.iterator(chunk_size=CHUNK_SIZE):
+            code = resolve_city(profile.city, profile.office_address)
+            if code is None and (profile.city or profile.office_address):
+                unresolved[(profile.city or profile.office_address).strip()[:60]] += 1
+            if code != profile.city_ref_id:
+                profile.city_ref_id = code
+                changed.append(profile)
+
+        # bulk_update skips save()/signals, so cached pages are invalidated here.
+        LawyerProfile.objects.bulk_update(changed, ['city_ref'], batch_size=CHUNK_SIZE)
+        invalidate_lawyers([p.id for p in changed])
+
+        self.stdout.write(self.style.SUCCESS(f'Updated {len(changed)} lawyers.'))
+        if unresolved:
+            self.stdout.write(f'{sum(unresolved.values())} lawyers name a city that has no alias yet:')
+            for text, count in unresolved.most_common(20):
+                self.stdout.write(f'  {count:5d}  {text}')
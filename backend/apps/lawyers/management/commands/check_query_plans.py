@@ -0,0 +1,180 @@
+import json
+import random
+from datetime import time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN every hot directory/booking query and exit non-zero if any of them '
+        'falls back to a full table scan. Use --seed on an empty database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Insert this many throwaway lawyers (rolled back afterwards).')
+
+    def handle(self, *args, **options):
+        self.verbose = options['verbosity'] > 1
+        with transaction.atomic():
+            if options['seed']:
+                self.seed(options['seed'])
+            failures = self.check_all()
+            transaction.set_rollback(True)
+        if failures:
+            raise CommandError(f'{len(failures)} hot queries use a full table scan: ' + ', '.join(failures))
+        self.stdout.write(self.style.SUCCESS('All hot queries are served by an index.'))
+
+    # ── Hot queries ──────────────────────────────────────────
+
+    def hot_queries(self):
+        from apps.bookings.models import Booking
+        from apps.lawyers.models import LawyerProfile, LawyerLanguage, PracticeArea, Availability, Review
+        from apps.lawyers.next_slot import ACTIVE_BOOKING_STATUSES
+        from apps.lawyers.utils import day_bounds
+        from apps.otp.models import OTPRecord
+
+        today = timezone.localdate()
+        now = timezone.now()
+        lawyer_id = LawyerProfile.objects.values_list('id', flat=True).first()
+        customer_id = Booking.objects.values_list('customer_id', flat=True).first()
+        day_start, day_end = day_bounds(today)
+        verified = LawyerProfile.objects.filter(verification_status='verified')
+
+        return [
+            ('directory default ordering', 'lawyer_profiles', verified.order_by('-rank_score', 'id')[:12]),
+            ('directory by rating', 'lawyer_profiles', verified.order_by('-average_rating', 'id')[:12]),
+            ('directory by experience', 'lawyer_profiles', verified.order_by('-years_experience', 'id')[:12]),
+            ('directory by hourly rate', 'lawyer_profiles', verified.order_by('hourly_rate', 'id')[:12]),
+            ('directory by bookings', 'lawyer_profiles', verified.order_by('-total_bookings', 'id')[:12]),
+            ('city filter', 'lawyer_profiles', verified.filter(city_ref_id='tehran')),
+            ('near bounding box', 'lawyer_profiles',
+             LawyerProfile.objects.filter(latitude__range=(35.6, 35.8), longitude__range=(51.3, 51.5))),
+            ('justive fee filter', 'lawyer_profiles',
+             verified.filter(is_accepting_clients=True, consultation_fee__lte=500000)),
+            ('language filter', 'lawyer_languages', LawyerLanguage.objects.filter(code='en').values('lawyer_id')),
+            ('practice area filter', 'lawyer_practice_areas',
+             PracticeArea.objects.filter(area='family').values('lawyer_id')),
+            ('availability exact date', 'lawyer_availability',
+             Availability.objects.filter(lawyer_id=lawyer_id, date=today)),
+            ('availability weekday', 'lawyer_availability',
+             Availability.objects.filter(lawyer_id=lawyer_id, day_of_week='mon', is_closed=False)),
+            ('booked slots of a day', 'bookings',
+             Booking.objects.filter(lawyer_id=lawyer_id, scheduled_at__gte=day_start, scheduled_at__lt=day_end,
+                                    status__in=ACTIVE_BOOKING_STATUSES)),
+            ('lawyer dashboard', 'bookings',
+             Booking.objects.filter(lawyer_id=lawyer_id, status='pending', scheduled_at__gte=now)),
+            ('customer dashboard', 'bookings',
+             Booking.objects.filter(customer_id=customer_id, status='confirmed', scheduled_at__gte=now)),
+            ('latest reviews', 'lawyer_reviews', Review.objects.filter(lawyer_id=lawyer_id).order_by('-created_at')[:5]),
+            ('my review', 'lawyer_reviews', Review.objects.filter(lawyer_id=lawyer_id, customer_id=customer_id)),
+            ('active otp', 'otp_records',
+             OTPRecord.objects.filter(phone='09120000000', is_used=False).order_by('-created_at')[:1]),
+        ]
+
+    def check_all(self):
+        if connection.vendor == 'postgresql':
+            # Small seeded tables would make a sequential scan the cheapest plan; we
+            # only want to know whether an index *can* serve the query.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        failures = []
+        for label, table, queryset in self.hot_queries():
+            sql, params = queryset.query.sql_with_params()
+            plan = self.explain(sql, params)
+            full_scan = self.has_full_scan(plan, table)
+            status = self.style.ERROR('FULL SCAN') if full_scan else self.style.SUCCESS('ok')
+            self.stdout.write(f'{status}  {label}')
+            if self.verbose:
+                for line in plan:
+                    self.stdout.write(f'    {line}')
+            if full_scan:
+                failures.append(label)
+        return failures
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return list(_pg_nodes(plan[0]['Plan']))
+            if connection.vendor == 'sqlite':
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                return [row[-1] for row in cursor.fetchall()]
+        raise CommandError(f'check_query_plans does not support {connection.vendor}.')
+
+    def has_full_scan(self, plan, table):
+        if connection.vendor == 'postgresql':
+            return any(node.startswith('Seq Scan') and f' on {table}' in node for node in plan)
+        # SQLite: "SCAN t" is a full scan, "SCAN t USING INDEX" / "SEARCH t ..." are not.
+        return any(line.strip() in (f'SCAN {table}', f'SCAN TABLE {table}') for line in plan)
+
+    # ── Seed data ────────────────────────────────────────────
+
+    def seed(self, count):
+        from apps.accounts.models import User
+        from apps.bookings.models import Booking
+        from apps.lawyers.models import LawyerProfile, LawyerLanguage, PracticeArea, Availability, Review
+        from apps.otp.models import OTPRecord
+
+        today = timezone.localdate()
+        customers = User.objects.bulk_create([
+            User(phone=f'0999{i:07d}', first_name='plan', last_name='check', role='customer')
+            for i in range(max(count // 10, 1))
+        ])
+        users = User.objects.bulk_create([
+            User(phone=f'0998{i:07d}', first_name='plan', last_name='check', role='lawyer') for i in range(count)
+        ])
+        profiles = LawyerProfile.objects.bulk_create([
+            LawyerProfile(
+                user=user, bar_number=f'PLAN-{i}',
+                verification_status=random.choice(['verified', 'verified', 'pending']),
+                is_featured=random.random() < 0.1, average_rating=random.choice([0, 3, 4, 4.5, 5]),
+                rank_score=random.uniform(0, 8),
+                consultation_fee=random.choice([300000, 500000, 900000]),
+                city_ref_id=random.choice([None, 'tehran', 'mashhad', 'isfahan', 'shiraz']),
+                latitude=random.uniform(25, 40), longitude=random.uniform(44, 63),
+            )
+            for i, user in enumerate(users)
+        ])
+        areas, languages, avails, bookings, reviews = [], [], [], [], []
+        for profile in profiles:
+            areas.append(PracticeArea(lawyer=profile, area=random.choice(['family', 'criminal', 'civil'])))
+            languages += [LawyerLanguage(lawyer=profile, code=code) for code in {'fa', random.choice(['en', 'ar', 'tr'])}]
+            avails += [
+                Availability(lawyer=profile, day_of_week=day, start_time=time(9), end_time=time(13))
+                for day in ('sat', 'sun', 'mon', 'tue', 'wed')
+            ]
+            avails.append(Availability(lawyer=profile, date=today + timedelta(days=random.randint(0, 13)),
+                                       start_time=time(16), end_time=time(18)))
+            for k in range(5):
+                customer = random.choice(customers)
+                bookings.append(Booking(
+                    customer=customer, lawyer=profile, subject='plan check',
+                    scheduled_at=timezone.now() + timedelta(days=random.randint(-30, 30), hours=k),
+                    status=random.choice(['pending', 'confirmed', 'completed', 'cancelled']),
+                ))
+            reviews.append(Review(lawyer=profile, customer=random.choice(customers), rating=4))
+        PracticeArea.objects.bulk_create(areas)
+        LawyerLanguage.objects.bulk_create(languages)
+        Availability.objects.bulk_create(avails)
+        Booking.objects.bulk_create(bookings)
+        Review.objects.bulk_create(reviews)
+        OTPRecord.objects.bulk_create([
+            OTPRecord(phone=f'0998{i:07d}', code='0000', expires_at=timezone.now()) for i in range(count)
+        ])
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def _pg_nodes(node):
+    relation = node.get('Relation Name')
+    yield f"{node['Node Type']} on {relation}" if relation else node['Node Type']
+    for child in node.get('Plans', []):
+        yield from _pg_nodes(child)
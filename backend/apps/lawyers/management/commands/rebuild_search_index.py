@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from apps.lawyers.models import LawyerProfile
+from apps.lawyers.search import index_lawyers
+
+CHUNK_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents of every lawyer.'
+
+    def handle(self, *args, **options):
+        ids = list(LawyerProfile.objects.values_list('id', flat=True))
+        for i in range(0, len(ids), CHUNK_SIZE):
+            index_lawyers(ids[i:i + CHUNK_SIZE])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {len(ids)} lawyers.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.lawyers.cache import invalidate_autocomplete, invalidate_directory
+from apps.lawyers.ranking import refresh_rank_scores
+
+
+class Command(BaseCommand):
+    help = 'Recompute the directory rank_score of every lawyer. Run nightly, after refresh_next_slots.'
+
+    def handle(self, *args, **options):
+        updated = refresh_rank_scores()
+        if updated:
+            invalidate_directory()
+            invalidate_autocomplete()  # suggestions are ordered by rank
+        self.stdout.write(self.style.SUCCESS(f'Updated rank score of {updated} lawyers.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.lawyers.cache import invalidate_directory
+from apps.lawyers.next_slot import refresh_next_slots
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored next free slot of every lawyer. Run once a day after midnight.'
+
+    def handle(self, *args, **options):
+        updated = refresh_next_slots()
+        if updated:
+            invalidate_directory()
+        self.stdout.write(self.style.SUCCESS(f'Refreshed next free slots; {updated} lawyers have a new one.'))
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0005_alter_availability_slot_duration_minutes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lawyerprofile",
+            name="next_slot_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="lawyerprofile",
+            name="next_slot_refreshed_on",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="lawyerprofile",
+            name="next_slot_time",
+            field=models.TimeField(blank=True, null=True),
+        ),
+    ]
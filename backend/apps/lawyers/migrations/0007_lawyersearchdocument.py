@@ -0,0 +1,83 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS lawyer_search_fts "
+                "USING fts5(lawyer_id UNINDEXED, body, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except Exception:
+            # SQLite built without FTS5: search.py falls back to icontains.
+            pass
+    elif connection.vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE lawyer_search_documents ADD COLUMN body_tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED"
+        )
+        schema_editor.execute(
+            "CREATE INDEX lawyer_search_documents_tsv_idx "
+            "ON lawyer_search_documents USING GIN (body_tsv)"
+        )
+
+
+def backfill_search_documents(apps, schema_editor):
+    from apps.lawyers.search import FTS_TABLE, build_document
+
+    LawyerProfile = apps.get_model("lawyers", "LawyerProfile")
+    LawyerSearchDocument = apps.get_model("lawyers", "LawyerSearchDocument")
+    profiles = LawyerProfile.objects.select_related("user").prefetch_related("practice_areas")
+    docs = [
+        LawyerSearchDocument(lawyer_id=profile.id, body=build_document(profile))
+        for profile in profiles.iterator(chunk_size=500)
+    ]
+    LawyerSearchDocument.objects.bulk_create(docs, batch_size=500)
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite" and FTS_TABLE in connection.introspection.table_names():
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (lawyer_id, body) VALUES (%s, %s)",
+                [(doc.lawyer_id.hex, doc.body) for doc in docs],
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS lawyer_search_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0006_lawyerprofile_next_slot_date_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LawyerSearchDocument",
+            fields=[
+                (
+                    "lawyer",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="lawyers.lawyerprofile",
+                    ),
+                ),
+                ("body", models.TextField(blank=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "lawyer_search_documents",
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_trigrams(apps, schema_editor):
+    from apps.lawyers.search import build_fuzzy_text
+    from apps.lawyers.text import trigrams
+
+    LawyerProfile = apps.get_model("lawyers", "LawyerProfile")
+    LawyerTrigram = apps.get_model("lawyers", "LawyerTrigram")
+    profiles = LawyerProfile.objects.select_related("user").prefetch_related("practice_areas")
+    rows = [
+        LawyerTrigram(lawyer_id=profile.id, trigram=gram)
+        for profile in profiles.iterator(chunk_size=500)
+        for gram in trigrams(build_fuzzy_text(profile))
+    ]
+    LawyerTrigram.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0007_lawyersearchdocument"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LawyerTrigram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("trigram", models.CharField(max_length=3)),
+                (
+                    "lawyer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trigrams",
+                        to="lawyers.lawyerprofile",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "lawyer_trigrams",
+                "unique_together": {("trigram", "lawyer")},
+            },
+        ),
+        migrations.RunPython(backfill_trigrams, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0008_lawyertrigram"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="availability",
+            index=models.Index(fields=["lawyer", "date"], name="availability_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="availability",
+            index=models.Index(
+                fields=["lawyer", "day_of_week"], name="availability_weekday_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lawyerprofile",
+            index=models.Index(
+                fields=["verification_status", "-is_featured", "-average_rating", "id"],
+                name="lawyer_dir_default_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lawyerprofile",
+            index=models.Index(
+                fields=["verification_status", "average_rating"],
+                name="lawyer_dir_rating_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lawyerprofile",
+            index=models.Index(
+                fields=["verification_status", "years_experience"],
+                name="lawyer_dir_experience_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lawyerprofile",
+            index=models.Index(
+                fields=["verification_status", "hourly_rate"],
+                name="lawyer_dir_rate_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lawyerprofile",
+            index=models.Index(
+                fields=["verification_status", "total_bookings"],
+                name="lawyer_dir_bookings_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lawyerprofile",
+            index=models.Index(
+                fields=[
+                    "verification_status",
+                    "is_accepting_clients",
+                    "consultation_fee",
+                ],
+                name="lawyer_dir_fee_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="practicearea",
+            index=models.Index(
+                fields=["area", "lawyer"], name="practice_area_lookup_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["lawyer", "-created_at"], name="review_lawyer_recent_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["lawyer", "customer"], name="review_lawyer_customer_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,142 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# (code, Persian name, English name, extra spellings). Names themselves are aliases too.
+CITIES = [
+    ("tehran", "تهران", "Tehran", ["teheran"]),
+    ("mashhad", "مشهد", "Mashhad", ["mashad", "meshed"]),
+    ("isfahan", "اصفهان", "Isfahan", ["esfahan"]),
+    ("karaj", "کرج", "Karaj", []),
+    ("shiraz", "شیراز", "Shiraz", []),
+    ("tabriz", "تبریز", "Tabriz", []),
+    ("qom", "قم", "Qom", ["ghom"]),
+    ("ahvaz", "اهواز", "Ahvaz", ["ahwaz"]),
+    ("kermanshah", "کرمانشاه", "Kermanshah", []),
+    ("urmia", "ارومیه", "Urmia", ["orumiyeh", "urmieh"]),
+    ("rasht", "رشت", "Rasht", []),
+    ("zahedan", "زاهدان", "Zahedan", []),
+    ("hamadan", "همدان", "Hamadan", ["hamedan"]),
+    ("kerman", "کرمان", "Kerman", []),
+    ("yazd", "یزد", "Yazd", []),
+    ("ardabil", "اردبیل", "Ardabil", []),
+    ("bandar_abbas", "بندرعباس", "Bandar Abbas", ["بندر عباس", "bandarabbas"]),
+    ("arak", "اراک", "Arak", []),
+    ("zanjan", "زنجان", "Zanjan", []),
+    ("sanandaj", "سنندج", "Sanandaj", []),
+    ("qazvin", "قزوین", "Qazvin", ["ghazvin"]),
+    ("khorramabad", "خرم\u200cآباد", "Khorramabad", ["خرم آباد", "خرمآباد"]),
+    ("gorgan", "گرگان", "Gorgan", []),
+    ("sari", "ساری", "Sari", []),
+    ("bushehr", "بوشهر", "Bushehr", []),
+    ("birjand", "بیرجند", "Birjand", []),
+    ("ilam", "ایلام", "Ilam", []),
+    ("shahrekord", "شهرکرد", "Shahrekord", ["شهر کرد", "shahr-e kord"]),
+    ("yasuj", "یاسوج", "Yasuj", ["yasouj"]),
+    ("semnan", "سمنان", "Semnan", []),
+    ("bojnurd", "بجنورد", "Bojnurd", ["bojnord"]),
+    ("kish", "کیش", "Kish", []),
+]
+
+
+def seed_cities(apps, schema_editor):
+    from apps.lawyers.text import normalize
+
+    City = apps.get_model("lawyers", "City")
+    CityAlias = apps.get_model("lawyers", "CityAlias")
+    for code, name_fa, name_en, extra in CITIES:
+        city, _ = City.objects.get_or_create(
+            code=code, defaults={"name_fa": name_fa, "name_en": name_en}
+        )
+        for alias in {normalize(a) for a in [name_fa, name_en, *extra]}:
+            CityAlias.objects.get_or_create(alias=alias, defaults={"city": city})
+
+
+def backfill_city_refs(apps, schema_editor):
+    from apps.lawyers.cities import alias_index, match_city
+
+    City = apps.get_model("lawyers", "City")
+    CityAlias = apps.get_model("lawyers", "CityAlias")
+    LawyerProfile = apps.get_model("lawyers", "LawyerProfile")
+    index = alias_index(
+        City.objects.values_list("code", "name_fa", "name_en"),
+        CityAlias.objects.values_list("alias", "city_id"),
+    )
+    changed = []
+    for profile in LawyerProfile.objects.only("id", "city", "office_address").iterator(chunk_size=500):
+        profile.city_ref_id = match_city(index, [profile.city, profile.office_address])
+        if profile.city_ref_id:
+            changed.append(profile)
+    LawyerProfile.objects.bulk_update(changed, ["city_ref"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0009_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="City",
+            fields=[
+                ("code", models.SlugField(primary_key=True, serialize=False)),
+                ("name_fa", models.CharField(max_length=100)),
+                ("name_en", models.CharField(max_length=100)),
+            ],
+            options={
+                "verbose_name_plural": "cities",
+                "db_table": "cities",
+                "ordering": ["name_fa"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CityAlias",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("alias", models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                "verbose_name_plural": "city aliases",
+                "db_table": "city_aliases",
+            },
+        ),
+        migrations.AddField(
+            model_name="cityalias",
+            name="city",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="aliases",
+                to="lawyers.city",
+            ),
+        ),
+        migrations.AddField(
+            model_name="lawyerprofile",
+            name="city_ref",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="lawyers",
+                to="lawyers.city",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lawyerprofile",
+            index=models.Index(
+                fields=["city_ref", "verification_status"], name="lawyer_dir_city_idx"
+            ),
+        ),
+        migrations.RunPython(seed_cities, migrations.RunPython.noop),
+        migrations.RunPython(backfill_city_refs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_languages(apps, schema_editor):
+    from apps.lawyers.languages import language_codes
+
+    LawyerProfile = apps.get_model("lawyers", "LawyerProfile")
+    LawyerLanguage = apps.get_model("lawyers", "LawyerLanguage")
+    rows = [
+        LawyerLanguage(lawyer_id=lawyer_id, code=code)
+        for lawyer_id, languages in LawyerProfile.objects.values_list("id", "languages")
+        for code in language_codes(languages)
+    ]
+    LawyerLanguage.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0010_city"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LawyerLanguage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("code", models.CharField(max_length=30)),
+                (
+                    "lawyer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="language_rows",
+                        to="lawyers.lawyerprofile",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "lawyer_languages",
+                "indexes": [
+                    models.Index(
+                        fields=["code", "lawyer"], name="lawyer_language_code_idx"
+                    )
+                ],
+                "unique_together": {("lawyer", "code")},
+            },
+        ),
+        migrations.RunPython(backfill_languages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0011_lawyerlanguage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lawyerprofile",
+            name="content_version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0012_lawyerprofile_content_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lawyerprofile",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="lawyerprofile",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="lawyerprofile",
+            index=models.Index(fields=["latitude", "longitude"], name="lawyer_geo_idx"),
+        ),
+    ]
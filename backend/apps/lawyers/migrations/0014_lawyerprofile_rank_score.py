@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:38
+
+from django.db import migrations, models
+
+
+def backfill_rank_scores(apps, schema_editor):
+    from django.db.models import Max
+
+    from apps.lawyers.ranking import rank_score, rank_weights
+
+    LawyerProfile = apps.get_model("lawyers", "LawyerProfile")
+    Review = apps.get_model("lawyers", "Review")
+    Booking = apps.get_model("bookings", "Booking")
+    latest = {}
+    for model in (Review, Booking):
+        rows = model.objects.values("lawyer_id").annotate(last=Max("created_at")).order_by()
+        for row in rows:
+            if row["last"] and (row["lawyer_id"] not in latest or row["last"] > latest[row["lawyer_id"]]):
+                latest[row["lawyer_id"]] = row["last"]
+    weights = rank_weights()
+    profiles = []
+    fields = ("id", "average_rating", "total_reviews", "total_bookings", "is_featured", "next_slot_date")
+    for profile in LawyerProfile.objects.only(*fields).iterator(chunk_size=500):
+        profile.rank_score = rank_score(profile, latest.get(profile.id), weights=weights)
+        profiles.append(profile)
+    LawyerProfile.objects.bulk_update(profiles, ["rank_score"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0013_lawyerprofile_location"),
+        ("bookings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="lawyerprofile",
+            name="lawyer_dir_default_idx",
+        ),
+        migrations.AddField(
+            model_name="lawyerprofile",
+            name="rank_score",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="lawyerprofile",
+            index=models.Index(
+                fields=["verification_status", "-rank_score", "id"],
+                name="lawyer_dir_rank_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_rank_scores, migrations.RunPython.noop),
+    ]
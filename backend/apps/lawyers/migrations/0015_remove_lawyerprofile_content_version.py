@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 00:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lawyers", "0014_lawyerprofile_rank_score"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="lawyerprofile",
+            name="content_version",
+        ),
+    ]
@@ -21,6 +21,24 @@ PRACTICE_AREAS = [
     ('international', 'International Law'),
 ]
 
+PRACTICE_AREA_FA = {
+    'corporate': 'حقوق شرکت‌ها',
+    'criminal': 'کیفری و جزایی',
+    'family': 'خانواده و طلاق',
+    'immigration': 'مهاجرت',
+    'intellectual_property': 'مالکیت فکری',
+    'real_estate': 'ملک و املاک',
+    'employment': 'حقوق کار و استخدام',
+    'tax': 'حقوق مالیاتی',
+    'personal_injury': 'خسارت و دیه',
+    'bankruptcy': 'ورشکستگی',
+    'civil_litigation': 'دعاوی حقوقی',
+    'estate_planning': 'وصیت و ارث',
+    'healthcare': 'حقوق پزشکی و سلامت',
+    'environmental': 'حقوق محیط زیست',
+    'international': 'حقوق بین‌الملل',
+}
+
 DAYS_OF_WEEK = [
     ('mon', 'Monday'),
     ('tue', 'Tuesday'),
@@ -32,6 +50,39 @@ DAYS_OF_WEEK = [
 ]
 
 
+class City(models.Model):
+    """Canonical city. Lawyers point at it through `LawyerProfile.city_ref` (see cities.py)."""
+    code = models.SlugField(max_length=50, primary_key=True)
+    name_fa = models.CharField(max_length=100)
+    name_en = models.CharField(max_length=100)
+
+    class Meta:
+        db_table = 'cities'
+        ordering = ['name_fa']
+        verbose_name_plural = 'cities'
+
+    def __str__(self):
+        return self.name_fa
+
+
+class CityAlias(models.Model):
+    """A spelling of a city name, stored normalized (text.normalize) so lookups are exact."""
+    city = models.ForeignKey(City, on_delete=models.CASCADE, related_name='aliases')
+    alias = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        db_table = 'city_aliases'
+        verbose_name_plural = 'city aliases'
+
+    def save(self, *args, **kwargs):
+        from .text import normalize
+        self.alias = normalize(self.alias)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.alias
+
+
 class LawyerProfile(models.Model):
     VERIFICATION_STATUS = [
         ('pending', 'Pending Review'),
@@ -57,6 +108,12 @@ class LawyerProfile(models.Model):
     languages = models.JSONField(default=list, blank=True)  # ["English", "Spanish"]
     city = models.CharField(max_length=100, blank=True)
     office_address = models.TextField(blank=True)
+    # Resolved from city/office_address on save; the indexed column city filters use.
+    city_ref = models.ForeignKey(City, on_delete=models.SET_NULL, null=True, blank=True,
+                                 db_index=False, related_name='lawyers')
+    # Office location (WGS84) for ?near= searches, see geo.py
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
     website = models.URLField(blank=True)
     linkedin = models.URLField(blank=True)
 
@@ -70,15 +127,44 @@ class LawyerProfile(models.Model):
     average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
     total_bookings = models.PositiveIntegerField(default=0)
 
+    # First free slot in the next 14 days (denormalized, see next_slot.py)
+    next_slot_date = models.DateField(null=True, blank=True)
+    next_slot_time = models.TimeField(null=True, blank=True)
+    next_slot_refreshed_on = models.DateField(null=True, blank=True)
+
+    # Default directory ordering, maintained by ranking.py
+    rank_score = models.FloatField(default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'lawyer_profiles'
+        indexes = [
+            # Default directory ordering: verified, then -rank_score, id.
+            models.Index(fields=['verification_status', '-rank_score', 'id'], name='lawyer_dir_rank_idx'),
+            models.Index(fields=['verification_status', 'average_rating'], name='lawyer_dir_rating_idx'),
+            models.Index(fields=['verification_status', 'years_experience'], name='lawyer_dir_experience_idx'),
+            models.Index(fields=['verification_status', 'hourly_rate'], name='lawyer_dir_rate_idx'),
+            models.Index(fields=['verification_status', 'total_bookings'], name='lawyer_dir_bookings_idx'),
+            models.Index(fields=['verification_status', 'is_accepting_clients', 'consultation_fee'],
+                         name='lawyer_dir_fee_idx'),
+            models.Index(fields=['city_ref', 'verification_status'], name='lawyer_dir_city_idx'),
+            models.Index(fields=['latitude', 'longitude'], name='lawyer_geo_idx'),
+        ]
 
     def __str__(self):
         return f'Lawyer: {self.user.full_name}'
 
+    def save(self, *args, **kwargs):
+        from .cities import resolve_city
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'city', 'office_address'} & set(update_fields):
+            self.city_ref_id = resolve_city(self.city, self.office_address)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'city_ref'}
+        super().save(*args, **kwargs)
+
 
 class PracticeArea(models.Model):
     lawyer = models.ForeignKey(LawyerProfile, on_delete=models.CASCADE, related_name='practice_areas')
@@ -88,6 +174,7 @@ class PracticeArea(models.Model):
     class Meta:
         db_table = 'lawyer_practice_areas'
         unique_together = ('lawyer', 'area')
+        indexes = [models.Index(fields=['area', 'lawyer'], name='practice_area_lookup_idx')]
 
     def __str__(self):
         return f'{self.lawyer.user.full_name} — {self.get_area_display()}'
@@ -117,6 +204,10 @@ class Availability(models.Model):
     class Meta:
         db_table = 'lawyer_availability'
         ordering = ['date', 'day_of_week', 'start_time']
+        indexes = [
+            models.Index(fields=['lawyer', 'date'], name='availability_date_idx'),
+            models.Index(fields=['lawyer', 'day_of_week'], name='availability_weekday_idx'),
+        ]
 
     def __str__(self):
         label = self.date or self.get_day_of_week_display()
@@ -140,3 +231,39 @@ class Review(models.Model):
     class Meta:
         db_table = 'lawyer_reviews'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['lawyer', '-created_at'], name='review_lawyer_recent_idx'),
+            models.Index(fields=['lawyer', 'customer'], name='review_lawyer_customer_idx'),
+        ]
+
+
+class LawyerSearchDocument(models.Model):
+    """Denormalized search text of a lawyer. Mirrored into FTS5 (SQLite) or a tsvector column (PostgreSQL)."""
+    lawyer = models.OneToOneField(LawyerProfile, on_delete=models.CASCADE, primary_key=True,
+                                  related_name='search_document')
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'lawyer_search_documents'
+
+
+class LawyerTrigram(models.Model):
+    """Trigrams of a lawyer's name, practice areas and city, for typo-tolerant search."""
+    lawyer = models.ForeignKey(LawyerProfile, on_delete=models.CASCADE, related_name='trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        db_table = 'lawyer_trigrams'
+        unique_together = ('trigram', 'lawyer')
+
+
+class LawyerLanguage(models.Model):
+    """One row per language a lawyer speaks, mirrored from `LawyerProfile.languages` (see languages.py)."""
+    lawyer = models.ForeignKey(LawyerProfile, on_delete=models.CASCADE, related_name='language_rows')
+    code = models.CharField(max_length=30)
+
+    class Meta:
+        db_table = 'lawyer_languages'
+        unique_together = ('lawyer', 'code')
+        indexes = [models.Index(fields=['code', 'lawyer'], name='lawyer_language_code_idx')]
@@ -0,0 +1,130 @@
+"""Persisted "next free slot" index for the lawyer directory.
+
+List cards only need the first free slot of the next two weeks, so it is
+stored on LawyerProfile and refreshed when availability or bookings change
+(see signals.py) and once a day by `manage.py refresh_next_slots`.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import LawyerProfile, Availability
+from .utils import day_bounds
+
+WINDOW_DAYS = 14
+DAY_ABBRS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+ACTIVE_BOOKING_STATUSES = ['pending', 'confirmed']
+REFRESH_CHUNK_SIZE = 500
+
+
+def day_rules(avails, day):
+    """(is_closed, open availability rows) for one day. Exact date rows have priority over weekly rows."""
+    exact = [a for a in avails if a.date == day]
+    if exact:
+        if any(a.is_closed for a in exact):
+            return True, []
+        return False, [a for a in exact if not a.is_closed]
+    day_abbr = DAY_ABBRS[day.weekday()]
+    return False, [a for a in avails if a.date is None and a.day_of_week == day_abbr and not a.is_closed]
+
+
+def first_free_slot(avails, bookings, start_date, days=WINDOW_DAYS):
+    """Return (date, time) of the first slot no booking overlaps, or (None, None).
+
+    `avails` are the lawyer's Availability rows, `bookings` (naive datetime,
+    duration_minutes) pairs of active bookings (same convention as available_slots).
+    """
+    from apps.bookings.slot_engine import first_free
+
+    by_day = defaultdict(list)
+    for scheduled_at, duration in bookings:
+        by_day[scheduled_at.date()].append((scheduled_at, duration))
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        _, rules = day_rules(avails, day)
+        slot_time = first_free(day, rules, by_day[day])
+        if slot_time is not None:
+            return day, slot_time
+    return None, None
+
+
+def compute_next_slots(lawyer_ids, today=None):
+    """Compute {lawyer_id: (date, time)} for many lawyers with two queries."""
+    from apps.bookings.models import Booking
+
+    today = today or timezone.localdate()
+    last_day = today + timedelta(days=WINDOW_DAYS - 1)
+    lawyer_ids = list(lawyer_ids)
+
+    avails_by_lawyer = defaultdict(list)
+    avails = Availability.objects.filter(lawyer_id__in=lawyer_ids).filter(
+        Q(date__isnull=True) | Q(date__range=(today, last_day))
+    )
+    for avail in avails:
+        avails_by_lawyer[avail.lawyer_id].append(avail)
+
+    booked_by_lawyer = defaultdict(list)
+    window_start, window_end = day_bounds(today, last_day)
+    booked = Booking.objects.filter(
+        lawyer_id__in=lawyer_ids,
+        scheduled_at__gte=window_start,
+        scheduled_at__lt=window_end,
+        status__in=ACTIVE_BOOKING_STATUSES,
+    ).values_list('lawyer_id', 'scheduled_at', 'duration_minutes')
+    for lawyer_id, scheduled_at, duration in booked:
+        booked_by_lawyer[lawyer_id].append((scheduled_at.replace(tzinfo=None), duration))
+
+    return {
+        lawyer_id: first_free_slot(avails_by_lawyer[lawyer_id], booked_by_lawyer[lawyer_id], today)
+        for lawyer_id in lawyer_ids
+    }
+
+
+def refresh_next_slots(lawyer_ids=None, today=None):
+    """Recompute and store the next free slot. `None` refreshes every lawyer.
+
+    Returns how many lawyers' next slot moved.
+    """
+    today = today or timezone.localdate()
+    if lawyer_ids is None:
+        lawyer_ids = LawyerProfile.objects.values_list('id', flat=True).iterator()
+    lawyer_ids = list(lawyer_ids)
+
+    updated = 0
+    for i in range(0, len(lawyer_ids), REFRESH_CHUNK_SIZE):
+        chunk = lawyer_ids[i:i + REFRESH_CHUNK_SIZE]
+        slots = compute_next_slots(chunk, today=today)
+        stored = {
+            lawyer_id: (slot_date, slot_time) for lawyer_id, slot_date, slot_time in
+            LawyerProfile.objects.filter(id__in=chunk).values_list('id', 'next_slot_date', 'next_slot_time')
+        }
+        profiles = []
+        for lawyer_id, (slot_date, slot_time) in slots.items():
+            updated += stored.get(lawyer_id) != (slot_date, slot_time)
+            profiles.append(LawyerProfile(
+                id=lawyer_id,
+                next_slot_date=slot_date,
+                next_slot_time=slot_time,
+                next_slot_refreshed_on=today,
+            ))
+        LawyerProfile.objects.bulk_update(
+            profiles, ['next_slot_date', 'next_slot_time', 'next_slot_refreshed_on']
+        )
+    return updated
+
+
+def next_slot_payload(profile, today=None):
+    """Badge payload for list cards, read from the stored columns (no queries)."""
+    today = today or timezone.localdate()
+    slot_date = profile.next_slot_date
+    slot_time = profile.next_slot_time
+    if not slot_date or not slot_time or slot_date < today:
+        return None
+    return {
+        'date': slot_date.isoformat(),
+        'time': slot_time.strftime('%H:%M'),
+        'display': f"{slot_date.strftime('%m/%d')} ساعت {slot_time.strftime('%H:%M')}",
+        'is_today': slot_date == today,
+    }
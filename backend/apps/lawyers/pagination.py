@@ -0,0 +1,150 @@
+import base64
+import hashlib
+import json
+from decimal import Decimal
+from uuid import UUID
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+APPROX_COUNT_TTL = 300
+
+
+def _encode_value(value):
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class KeysetPagination(BasePagination):
+    """Keyset ("seek") pagination over any composite ordering.
+
+    Unlike DRF's CursorPagination, the cursor stores the value of every
+    ordering field of the last row, so the next page is a plain
+    `WHERE (a, b, id) < (...)` seek with no OFFSET, and rows that change
+    between requests do not shift the pages. `id` is appended as tie-breaker.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 12
+    max_page_size = 50
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset):
+        ordering = [str(f) for f in queryset.query.order_by] or list(queryset.model._meta.ordering)
+        if not any(f.lstrip('-') in ('id', 'pk') for f in ordering):
+            ordering.append('id')
+        return ordering
+
+    def decode_cursor(self, request, ordering):
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(raw.encode()).decode())
+            values = payload['v']
+        except (ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if payload.get('o') != ordering or len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_cursor(self, row, ordering):
+        values = [_encode_value(getattr(row, f.lstrip('-'))) for f in ordering]
+        payload = json.dumps({'o': ordering, 'v': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def seek_filter(self, ordering, values):
+        """(f1, f2, ...) strictly after `values` in the given directions."""
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[i]})
+            for prev_field, prev_value in zip(ordering[:i], values[:i]):
+                step &= Q(**{prev_field.lstrip('-'): prev_value})
+            condition |= step
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+        self.base_queryset = queryset
+
+        values = self.decode_cursor(request, self.ordering)
+        if values is not None:
+            queryset = queryset.filter(self.seek_filter(self.ordering, values))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1], self.ordering) if self.has_next else None
+        return rows
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_approximate_count(self):
+        """Planner estimate on PostgreSQL, otherwise an exact count cached for a few minutes."""
+        if self.request.query_params.get('count') != 'approx':
+            return None
+        if connection.vendor == 'postgresql':
+            sql, params = self.base_queryset.order_by().query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+        url = remove_query_param(self.request.get_full_path(), self.cursor_query_param)
+        key = 'keyset-count:' + hashlib.md5(url.encode()).hexdigest()
+        return cache.get_or_set(key, self.base_queryset.count, APPROX_COUNT_TTL)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.next_cursor,
+            'approximate_count': self.get_approximate_count(),
+            'results': data,
+        })
+
+
+class LawyerPagination(PageNumberPagination):
+    """Page numbers by default; keyset pages when the client opts in with `?cursor=`.
+
+    Infinite-scroll clients start with `?cursor=` (empty) and follow `next`.
+    """
+
+    def __init__(self):
+        self.keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            self.keyset = KeysetPagination()
+            self.keyset.page_size = self.page_size or self.keyset.page_size
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
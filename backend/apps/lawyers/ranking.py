@@ -0,0 +1,115 @@
+"""Precomputed `rank_score` for the default directory ordering.
+
+The score is a weighted blend of normalized signals (each in [0, 1]):
+
+    rating        Bayesian average rating (few reviews are pulled towards PRIOR_RATING)
+    reviews       log-scaled review count
+    bookings      log-scaled booking count
+    recency       decays with the days since the latest review or booking
+    availability  how soon the next free slot is (see next_slot.py)
+    featured      1 for featured lawyers
+
+Weights come from settings.LAWYER_RANK_WEIGHTS. signals.py refreshes the
+affected lawyers after review/booking/availability/profile changes and
+`manage.py recompute_rank_scores` recomputes everyone nightly (recency and
+availability drift with the calendar).
+"""
+import math
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import LawyerProfile, Review
+from .next_slot import WINDOW_DAYS
+
+DEFAULT_WEIGHTS = {
+    'rating': 3.0,
+    'reviews': 1.0,
+    'bookings': 1.0,
+    'recency': 0.5,
+    'availability': 1.0,
+    'featured': 2.0,
+}
+PRIOR_RATING = 3.5
+PRIOR_REVIEWS = 5
+REVIEWS_SATURATION = 100
+BOOKINGS_SATURATION = 200
+RECENCY_HALF_LIFE_DAYS = 30
+RANK_CHUNK_SIZE = 500
+
+
+def rank_weights():
+    return {**DEFAULT_WEIGHTS, **getattr(settings, 'LAWYER_RANK_WEIGHTS', {})}
+
+
+def _log_scale(value, saturation):
+    return min(math.log1p(value or 0) / math.log1p(saturation), 1.0)
+
+
+def rank_components(profile, last_activity=None, today=None):
+    today = today or timezone.localdate()
+    reviews = profile.total_reviews or 0
+    rating = (PRIOR_RATING * PRIOR_REVIEWS + float(profile.average_rating or 0) * reviews) / (PRIOR_REVIEWS + reviews)
+
+    recency = 0.0
+    if last_activity is not None:
+        days = max((today - timezone.localtime(last_activity).date()).days, 0)
+        recency = 0.5 ** (days / RECENCY_HALF_LIFE_DAYS)
+
+    availability = 0.0
+    if profile.next_slot_date and profile.next_slot_date >= today:
+        availability = max(1 - (profile.next_slot_date - today).days / WINDOW_DAYS, 0.0)
+
+    return {
+        'rating': rating / 5,
+        'reviews': _log_scale(reviews, REVIEWS_SATURATION),
+        'bookings': _log_scale(profile.total_bookings, BOOKINGS_SATURATION),
+        'recency': recency,
+        'availability': availability,
+        'featured': 1.0 if profile.is_featured else 0.0,
+    }
+
+
+def rank_score(profile, last_activity=None, today=None, weights=None):
+    weights = weights or rank_weights()
+    components = rank_components(profile, last_activity, today)
+    return round(sum(weights.get(name, 0) * value for name, value in components.items()), 6)
+
+
+def _last_activity(lawyer_ids):
+    from apps.bookings.models import Booking
+
+    latest = {}
+    for model in (Review, Booking):
+        rows = model.objects.filter(lawyer_id__in=lawyer_ids).values('lawyer_id').annotate(last=Max('created_at'))
+        for row in rows.order_by():
+            if row['last'] and (row['lawyer_id'] not in latest or row['last'] > latest[row['lawyer_id']]):
+                latest[row['lawyer_id']] = row['last']
+    return latest
+
+
+def refresh_rank_scores(lawyer_ids=None, today=None):
+    """Recompute and store rank_score (three queries per chunk). `None` refreshes every lawyer."""
+    today = today or timezone.localdate()
+    weights = rank_weights()
+    if lawyer_ids is None:
+        lawyer_ids = LawyerProfile.objects.values_list('id', flat=True).iterator()
+    lawyer_ids = list(lawyer_ids)
+
+    updated = 0
+    for i in range(0, len(lawyer_ids), RANK_CHUNK_SIZE):
+        chunk = lawyer_ids[i:i + RANK_CHUNK_SIZE]
+        activity = _last_activity(chunk)
+        profiles = list(LawyerProfile.objects.filter(id__in=chunk).only(
+            'id', 'average_rating', 'total_reviews', 'total_bookings', 'is_featured', 'next_slot_date', 'rank_score',
+        ))
+        changed = []
+        for profile in profiles:
+            score = rank_score(profile, activity.get(profile.id), today, weights)
+            if score != profile.rank_score:
+                profile.rank_score = score
+                changed.append(profile)
+        LawyerProfile.objects.bulk_update(changed, ['rank_score'])
+        updated += len(changed)
+    return updated
@@ -0,0 +1,160 @@
+"""Full-text search index for lawyer discovery.
+
+Each lawyer has one LawyerSearchDocument row holding the text that used to be
+matched with icontains (name, headline, bio, bar number, practice areas).
+The row is mirrored into an FTS5 virtual table on SQLite; on PostgreSQL the
+table has a generated tsvector column with a GIN index (migration 0007).
+Other backends fall back to icontains over the single document table.
+
+Text is passed through text.normalize at index and query time. When the
+full-text index has no hit, names/areas/city are matched by trigram overlap
+against the precomputed LawyerTrigram rows. search_queryset applies both as
+subqueries of the directory query, so results are never truncated.
+"""
+import re
+import uuid
+
+from django.db import connection
+from django.db.models import BooleanField, Count, F, FloatField, Func, OuterRef, Subquery, Value
+from django.db.models.expressions import RawSQL
+
+from .models import LawyerProfile, LawyerSearchDocument, LawyerTrigram, PRACTICE_AREA_FA
+from .text import normalize, trigrams
+
+FTS_TABLE = 'lawyer_search_fts'
+FUZZY_THRESHOLD = 0.5
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_document(profile):
+    user = profile.user
+    parts = [user.first_name, user.last_name, profile.headline, profile.bio, profile.bar_number]
+    for pa in profile.practice_areas.all():
+        parts += [pa.area, pa.get_area_display(), PRACTICE_AREA_FA.get(pa.area, '')]
+    return normalize(' '.join(p for p in parts if p))
+
+
+def build_fuzzy_text(profile):
+    parts = [profile.user.first_name, profile.user.last_name, profile.city]
+    for pa in profile.practice_areas.all():
+        parts += [pa.get_area_display(), PRACTICE_AREA_FA.get(pa.area, '')]
+    return ' '.join(p for p in parts if p)
+
+
+_fts_ready = False
+
+
+def fts_available():
+    global _fts_ready
+    if connection.vendor != 'sqlite':
+        return False
+    if not _fts_ready:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _fts_ready = cursor.fetchone() is not None
+    return _fts_ready
+
+
+def index_lawyers(lawyer_ids):
+    """Rebuild the search documents of the given lawyers."""
+    lawyer_ids = list(lawyer_ids)
+    profiles = (
+        LawyerProfile.objects.filter(id__in=lawyer_ids)
+        .select_related('user')
+        .prefetch_related('practice_areas')
+    )
+    docs, grams = [], []
+    for profile in profiles:
+        docs.append(LawyerSearchDocument(lawyer=profile, body=build_document(profile)))
+        grams += [LawyerTrigram(lawyer=profile, trigram=g) for g in trigrams(build_fuzzy_text(profile))]
+    LawyerSearchDocument.objects.bulk_create(
+        docs, update_conflicts=True, unique_fields=['lawyer'], update_fields=['body', 'updated_at'],
+    )
+    LawyerTrigram.objects.filter(lawyer_id__in=lawyer_ids).delete()
+    LawyerTrigram.objects.bulk_create(grams, batch_size=1000)
+    if fts_available():
+        _fts_delete(lawyer_ids)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (lawyer_id, body) VALUES (%s, %s)',
+                [(doc.lawyer_id.hex, doc.body) for doc in docs],
+            )
+    return len(docs)
+
+
+def remove_lawyers(lawyer_ids):
+    """Drop FTS rows of deleted lawyers. Document rows go away with the profile cascade."""
+    if fts_available():
+        _fts_delete(lawyer_ids)
+
+
+def _fts_delete(lawyer_ids):
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE lawyer_id = %s',
+            [(uuid.UUID(str(i)).hex,) for i in lawyer_ids],
+        )
+
+
+def tokenize(query):
+    return _TOKEN_RE.findall(normalize(query))
+
+
+class _FTSRank(Func):
+    """bm25 of a lawyer's FTS5 row for a MATCH expression; lower is better."""
+    template = f'(SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %(expressions)s)'
+    arg_joiner = ' AND lawyer_id = '
+    output_field = FloatField()
+
+
+def search_queryset(queryset, query, fuzzy=True, annotation='search_position'):
+    """Restrict `queryset` to lawyers matching every token of `query` (prefix match)
+    and annotate `annotation` with their relevance, lower is better.
+
+    Matching and ranking happen in SQL, so the result can be counted, ordered
+    and paginated like any other queryset; there is no cap on the number of
+    hits. Falls back to trigram overlap when nothing matches exactly and
+    `fuzzy` is set.
+    """
+    tokens = tokenize(query)
+    if tokens and (not fuzzy or _has_full_text_hit(tokens)):
+        matches, rank = _full_text_match(tokens)
+    elif fuzzy and trigrams(query):
+        matches, rank = _fuzzy_match(trigrams(query))
+    else:
+        return queryset.none()
+    return queryset.filter(id__in=matches).annotate(**{annotation: rank})
+
+
+def _full_text_match(tokens):
+    """(subquery of matching lawyer ids, per-row rank expression)."""
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{t}:*' for t in tokens)
+        docs = LawyerSearchDocument.objects.filter(
+            RawSQL("body_tsv @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField()),
+        )
+        rank = LawyerSearchDocument.objects.filter(lawyer_id=OuterRef('id')).annotate(
+            rank=RawSQL("-ts_rank(body_tsv, to_tsquery('simple', %s))", [tsquery], output_field=FloatField()),
+        ).values('rank')
+        return docs.values('lawyer_id'), Subquery(rank)
+    if fts_available():
+        match = ' '.join(f'"{t}"*' for t in tokens)
+        ids = RawSQL(f'SELECT lawyer_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        return ids, _FTSRank(Value(match), F('id'))
+    docs = LawyerSearchDocument.objects.all()
+    for token in tokens:
+        docs = docs.filter(body__icontains=token)
+    return docs.values('lawyer_id'), Value(0)
+
+
+def _has_full_text_hit(tokens):
+    ids, _ = _full_text_match(tokens)
+    return LawyerProfile.objects.filter(id__in=ids).exists()
+
+
+def _fuzzy_match(grams, threshold=FUZZY_THRESHOLD):
+    """Lawyers sharing at least `threshold` of the query's trigrams, ranked by how many they share."""
+    needed = max(1, int(len(grams) * threshold + 0.5))
+    shared = LawyerTrigram.objects.filter(trigram__in=grams).values('lawyer_id').annotate(hits=Count('id'))
+    rank = shared.filter(lawyer_id=OuterRef('id')).annotate(position=-F('hits')).values('position')
+    return shared.filter(hits__gte=needed).values('lawyer_id'), Subquery(rank)
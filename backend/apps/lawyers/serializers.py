@@ -1,5 +1,10 @@
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.utils import timezone
 from rest_framework import serializers
 from .models import LawyerProfile, PracticeArea, Education, Availability, Review
+from .geo import haversine_km, parse_near
+from .next_slot import compute_next_slots, next_slot_payload
+from .sparse import SparseFieldsMixin
 from apps.accounts.serializers import UserSerializer
 
 
@@ -38,7 +43,29 @@ class ReviewSerializer(serializers.ModelSerializer):
         return obj.customer.full_name
 
 
-class LawyerListSerializer(serializers.ModelSerializer):
+class LawyerPageSerializer(serializers.ListSerializer):
+    """Fills the next-slot columns of stale rows for the whole page at once.
+
+    Rows whose stored next slot was not refreshed today are recomputed with one
+    Availability and one Booking query for the page, instead of per row, and
+    only when the slot (or the badges derived from it) is rendered at all.
+    """
+
+    def to_representation(self, data):
+        lawyers = list(data.all() if hasattr(data, 'all') else data)
+        today = timezone.localdate()
+        stale = []
+        if {'first_available_slot', 'smart_badges'} & set(self.child.fields):
+            stale = [l for l in lawyers if l.next_slot_refreshed_on != today]
+        if stale:
+            slots = compute_next_slots([l.id for l in stale], today=today)
+            for lawyer in stale:
+                lawyer.next_slot_date, lawyer.next_slot_time = slots[lawyer.id]
+                lawyer.next_slot_refreshed_on = today
+        return super().to_representation(lawyers)
+
+
+class LawyerListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Lightweight serializer for listing/search results."""
     full_name = serializers.CharField(source='user.full_name', read_only=True)
     avatar_url = serializers.SerializerMethodField()
@@ -46,6 +73,7 @@ class LawyerListSerializer(serializers.ModelSerializer):
     primary_area = serializers.SerializerMethodField()
     first_available_slot = serializers.SerializerMethodField()
     smart_badges = serializers.SerializerMethodField()
+    distance_km = serializers.SerializerMethodField()
     practice_areas = PracticeAreaSerializer(many=True, read_only=True)
 
     class Meta:
@@ -56,7 +84,9 @@ class LawyerListSerializer(serializers.ModelSerializer):
             'average_rating', 'total_reviews', 'total_bookings',
             'is_accepting_clients', 'is_featured', 'verification_status',
             'primary_area', 'practice_areas', 'first_available_slot', 'smart_badges',
+            'latitude', 'longitude', 'distance_km',
         )
+        list_serializer_class = LawyerPageSerializer
 
     def get_avatar_url(self, obj):
         if obj.user.avatar:
@@ -75,29 +105,8 @@ class LawyerListSerializer(serializers.ModelSerializer):
 
 
     def get_first_available_slot(self, obj):
-        """Lightweight badge value for list card. Real slot logic remains in booking endpoint."""
-        from datetime import timedelta, datetime
-        from django.utils import timezone
-        from .models import Availability
-        today = timezone.localdate()
-        for offset in range(0, 14):
-            day = today + timedelta(days=offset)
-            exact = Availability.objects.filter(lawyer=obj, date=day).order_by('start_time')
-            if exact.exists():
-                if exact.filter(is_closed=True).exists():
-                    continue
-                av = exact.filter(is_closed=False).first()
-            else:
-                day_abbr = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun'][day.weekday()]
-                av = Availability.objects.filter(lawyer=obj, day_of_week=day_abbr, is_closed=False).order_by('start_time').first()
-            if av:
-                return {
-                    'date': day.isoformat(),
-                    'time': av.start_time.strftime('%H:%M'),
-                    'display': f"{day.strftime('%m/%d')} ساعت {av.start_time.strftime('%H:%M')}",
-                    'is_today': offset == 0,
-                }
-        return None
+        """Lightweight badge value for list card, read from the stored next-slot columns."""
+        return next_slot_payload(obj)
 
     def get_smart_badges(self, obj):
         first_slot = self.get_first_available_slot(obj)
@@ -113,34 +122,95 @@ class LawyerListSerializer(serializers.ModelSerializer):
         return ['فعال امروز']
 
 
+    def get_distance_km(self, obj):
+        """Distance from the ?near= point, or None without one (or without a stored location)."""
+        request = self.context.get('request')
+        point = parse_near(request.query_params.get('near')) if request is not None else None
+        if point is None or obj.latitude is None or obj.longitude is None:
+            return None
+        return round(haversine_km(*point, [obj.latitude], [obj.longitude])[0], 2)
+
     def get_primary_area(self, obj):
-        pa = obj.practice_areas.filter(is_primary=True).first()
+        # Iterate the prefetched areas instead of issuing a filtered query per row.
+        pa = next((pa for pa in obj.practice_areas.all() if pa.is_primary), None)
         return pa.get_area_display() if pa else None
 
 
+LATEST_REVIEWS = 5
+MY_REVIEW_FIELDS = ('id', 'rating', 'comment', 'is_anonymous', 'created_at')
+
+
+def latest_reviews_prefetch():
+    """Only the newest LATEST_REVIEWS reviews per lawyer, into `latest_reviews`; older ones are paged via the reviews endpoint."""
+    reviews = Review.objects.select_related('customer').order_by('-created_at', '-id')
+    return Prefetch('reviews', queryset=reviews[:LATEST_REVIEWS], to_attr='latest_reviews')
+
+
+def _viewer(request):
+    user = getattr(request, 'user', None)
+    return user if user is not None and user.is_authenticated else None
+
+
+def my_review_annotations(request):
+    """`my_review_<field>` subquery annotations for LawyerProfile querysets (empty for anonymous users)."""
+    user = _viewer(request)
+    if user is None:
+        return {}
+    own = Review.objects.filter(lawyer=OuterRef('pk'), customer=user)
+    return {f'my_review_{field}': Subquery(own.values(field)[:1]) for field in MY_REVIEW_FIELDS}
+
+
+def my_review_from_annotations(values, request):
+    """Build the `my_review` payload from annotated values (a dict or an annotated instance)."""
+    get = values.get if isinstance(values, dict) else lambda name: getattr(values, name, None)
+    if not get('my_review_id'):
+        return None
+    review = Review(customer=_viewer(request), **{field: get(f'my_review_{field}') for field in MY_REVIEW_FIELDS})
+    return ReviewSerializer(review, context={'request': request}).data
+
+
+def my_review_data(lawyer_id, request):
+    """The requesting customer's own review of a lawyer, or None for anonymous users."""
+    if _viewer(request) is None:
+        return None
+    review = Review.objects.filter(lawyer_id=lawyer_id, customer=request.user).first()
+    if not review:
+        return None
+    return ReviewSerializer(review, context={'request': request}).data
+
+
 class LawyerDetailSerializer(LawyerListSerializer):
     """Full details for a single lawyer page."""
     my_review = serializers.SerializerMethodField()
     education = EducationSerializer(many=True, read_only=True)
     availability = AvailabilitySerializer(many=True, read_only=True)
-    reviews = ReviewSerializer(many=True, read_only=True)
+    reviews = serializers.SerializerMethodField()
+    rating_histogram = serializers.SerializerMethodField()
     phone = serializers.CharField(source='user.phone', read_only=True)
 
     class Meta(LawyerListSerializer.Meta):
         fields = LawyerListSerializer.Meta.fields + (
             'bar_document', 'bio', 'languages', 'office_address',
             'website', 'linkedin', 'phone',
-            'education', 'availability', 'reviews', 'my_review',
+            'education', 'availability', 'reviews', 'rating_histogram', 'my_review',
         )
 
+    def get_reviews(self, obj):
+        """Latest LATEST_REVIEWS reviews; the rest are on /api/lawyers/<id>/reviews/."""
+        reviews = getattr(obj, 'latest_reviews', None)
+        if reviews is None:
+            reviews = obj.reviews.select_related('customer').order_by('-created_at', '-id')[:LATEST_REVIEWS]
+        return ReviewSerializer(reviews, many=True, context=self.context).data
+
+    def get_rating_histogram(self, obj):
+        counts = dict(obj.reviews.order_by().values_list('rating').annotate(n=Count('id')))
+        return {str(stars): counts.get(stars, 0) for stars in range(1, 6)}
+
     def get_my_review(self, obj):
         request = self.context.get('request')
-        if not request or not getattr(request, 'user', None) or not request.user.is_authenticated:
-            return None
-        review = obj.reviews.filter(customer=request.user).first()
-        if not review:
-            return None
-        return ReviewSerializer(review, context=self.context).data
+        if hasattr(obj, 'my_review_id'):
+            return my_review_from_annotations(obj, request)
+        return my_review_data(obj.id, request)
 
 
 class LawyerProfileUpdateSerializer(serializers.ModelSerializer):
@@ -154,7 +224,7 @@ class LawyerProfileUpdateSerializer(serializers.ModelSerializer):
         fields = (
             'bar_number', 'bar_document', 'headline', 'bio', 'years_experience',
             'hourly_rate', 'consultation_fee', 'languages',
-            'city', 'office_address', 'website', 'linkedin',
+            'city', 'office_address', 'latitude', 'longitude', 'website', 'linkedin',
             'is_accepting_clients', 'practice_areas', 'education', 'availability',
         )
 
@@ -165,6 +235,12 @@ class LawyerProfileUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({'bar_number': 'شماره پروانه وکالت الزامی است.'})
         if not bar_document:
             raise serializers.ValidationError({'bar_document': 'بارگذاری فایل پروانه وکالت الزامی است.'})
+        latitude = attrs.get('latitude', getattr(self.instance, 'latitude', None))
+        longitude = attrs.get('longitude', getattr(self.instance, 'longitude', None))
+        if (latitude is None) != (longitude is None):
+            raise serializers.ValidationError({'latitude': 'عرض و طول جغرافیایی باید با هم ثبت شوند.'})
+        if latitude is not None and not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise serializers.ValidationError({'latitude': 'موقعیت جغرافیایی نامعتبر است.'})
         return attrs
 
     def update(self, instance, validated_data):
@@ -172,24 +248,25 @@ class LawyerProfileUpdateSerializer(serializers.ModelSerializer):
         education_data = validated_data.pop('education', None)
         availability_data = validated_data.pop('availability', None)
 
+        from .signals import availability_rows_changed, education_changed, practice_areas_changed
+        from .sync import AVAILABILITY_KEY, EDUCATION_KEY, PRACTICE_AREA_KEY, sync_children
+
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
 
+        parent = {'lawyer': instance}
         if practice_areas is not None:
-            instance.practice_areas.all().delete()
-            for pa in practice_areas:
-                PracticeArea.objects.create(lawyer=instance, **pa)
+            if sync_children(instance.practice_areas.all(), practice_areas, PRACTICE_AREA_KEY, parent).changed:
+                practice_areas_changed([instance.id])
 
         if education_data is not None:
-            instance.education.all().delete()
-            for edu in education_data:
-                Education.objects.create(lawyer=instance, **edu)
+            if sync_children(instance.education.all(), education_data, EDUCATION_KEY, parent).changed:
+                education_changed([instance.id])
 
         if availability_data is not None:
-            instance.availability.all().delete()
-            for avail in availability_data:
-                Availability.objects.create(lawyer=instance, **avail)
+            if sync_children(instance.availability.all(), availability_data, AVAILABILITY_KEY, parent).changed:
+                availability_rows_changed([instance.id])
 
         return instance
 
@@ -0,0 +1,128 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.accounts.models import User
+from apps.bookings.models import Booking
+from apps.bookings.occupancy import booking_days, rebuild_days
+from .cache import invalidate_autocomplete, invalidate_directory, invalidate_lawyers
+from .cities import clear_city_cache
+from .models import City, CityAlias, LawyerProfile, PracticeArea, Availability, Review
+from .languages import sync_languages
+from .next_slot import refresh_next_slots
+from .ranking import refresh_rank_scores
+from .search import index_lawyers, remove_lawyers
+
+SEARCHABLE_PROFILE_FIELDS = {'headline', 'bio', 'bar_number', 'city'}
+SCHEDULED_BOOKING_FIELDS = {'status', 'scheduled_at', 'duration_minutes'}
+RANKED_PROFILE_FIELDS = {'average_rating', 'total_reviews', 'total_bookings', 'is_featured'}
+SEARCHABLE_USER_FIELDS = {'first_name', 'last_name'}
+DISPLAYED_USER_FIELDS = SEARCHABLE_USER_FIELDS | {'avatar', 'phone'}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+def _after_commit(func, lawyer_ids):
+    # Deferred so a cascade delete of the profile has finished before we rebuild anything,
+    # and so cache versions are bumped only once the new rows are visible to other requests.
+    lawyer_ids = list(lawyer_ids)
+    transaction.on_commit(lambda: func(lawyer_ids))
+
+
+# ── Child rows ──────────────────────────────────────────
+# Also called directly after sync.sync_children, whose bulk writes send no signals.
+
+def availability_rows_changed(lawyer_ids):
+    _after_commit(refresh_next_slots, lawyer_ids)
+    _after_commit(refresh_rank_scores, lawyer_ids)
+    _after_commit(invalidate_lawyers, lawyer_ids)
+
+
+def practice_areas_changed(lawyer_ids):
+    _after_commit(index_lawyers, lawyer_ids)
+    _after_commit(invalidate_lawyers, lawyer_ids)
+    # List rows show the areas, which are not part of the listed profile columns.
+    transaction.on_commit(invalidate_directory)
+
+
+def education_changed(lawyer_ids):
+    _after_commit(invalidate_lawyers, lawyer_ids)
+
+
+@receiver(post_save, sender=Availability)
+@receiver(post_delete, sender=Availability)
+def availability_changed(sender, instance, **kwargs):
+    availability_rows_changed([instance.lawyer_id])
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_occupancy_changed(sender, instance, update_fields=None, **kwargs):
+    # Not deferred: the day bitmaps must change in the same transaction as the booking.
+    if not _touches(update_fields, SCHEDULED_BOOKING_FIELDS):
+        return
+    loaded_at, loaded_duration = getattr(instance, '_loaded_schedule', (None, None))
+    days = booking_days(instance.scheduled_at, instance.duration_minutes) + booking_days(loaded_at, loaded_duration)
+    rebuild_days(instance.lawyer_id, days)
+    instance._loaded_schedule = (instance.scheduled_at, instance.duration_minutes)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def booking_changed(sender, instance, **kwargs):
+    _after_commit(refresh_next_slots, [instance.lawyer_id])
+    _after_commit(refresh_rank_scores, [instance.lawyer_id])
+    _after_commit(invalidate_lawyers, [instance.lawyer_id])
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    _after_commit(refresh_rank_scores, [instance.lawyer_id])
+    _after_commit(invalidate_lawyers, [instance.lawyer_id])
+
+
+@receiver(post_save, sender=LawyerProfile)
+def profile_saved(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, SEARCHABLE_PROFILE_FIELDS):
+        _after_commit(index_lawyers, [instance.id])
+    if _touches(update_fields, {'languages'}):
+        _after_commit(sync_languages, [instance.id])
+    if _touches(update_fields, RANKED_PROFILE_FIELDS):
+        _after_commit(refresh_rank_scores, [instance.id])
+    _after_commit(invalidate_lawyers, [instance.id])
+
+
+@receiver(post_delete, sender=LawyerProfile)
+def profile_deleted(sender, instance, **kwargs):
+    _after_commit(remove_lawyers, [instance.id])
+    _after_commit(invalidate_lawyers, [instance.id])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    if instance.role != 'lawyer' or not _touches(update_fields, DISPLAYED_USER_FIELDS):
+        return
+    lawyer_ids = LawyerProfile.objects.filter(user_id=instance.id).values_list('id', flat=True)
+    if _touches(update_fields, SEARCHABLE_USER_FIELDS):
+        _after_commit(index_lawyers, lawyer_ids)
+    _after_commit(invalidate_lawyers, lawyer_ids)
+
+
+@receiver(post_save, sender=PracticeArea)
+@receiver(post_delete, sender=PracticeArea)
+def practice_area_changed(sender, instance, **kwargs):
+    practice_areas_changed([instance.lawyer_id])
+
+
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=CityAlias)
+@receiver(post_delete, sender=CityAlias)
+def city_changed(sender, instance, **kwargs):
+    # Facet labels come from the city table; lawyers are re-resolved by `manage.py backfill_cities`.
+    clear_city_cache()
+    transaction.on_commit(invalidate_directory)
+    transaction.on_commit(invalidate_autocomplete)
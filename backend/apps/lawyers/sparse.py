@@ -0,0 +1,53 @@
+"""Sparse fieldsets: `?fields=id,full_name,consultation_fee` and `?omit=smart_badges`.
+
+Unrequested fields are removed from the serializer itself, so their
+SerializerMethodFields never run; views use `wants()` to skip the matching
+select/prefetch work. Only the top-level serializer of a response is
+trimmed — nested serializers keep their full shape.
+"""
+from rest_framework.serializers import ListSerializer
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def _names(request, param):
+    params = getattr(request, 'query_params', None)
+    if params is None:
+        return set()
+    return {name.strip() for name in params.get(param, '').split(',') if name.strip()}
+
+
+def wants(request, *names):
+    """Whether any of `names` will be rendered for this request."""
+    fields, omit = _names(request, FIELDS_PARAM), _names(request, OMIT_PARAM)
+    return any((not fields or name in fields) and name not in omit for name in names)
+
+
+def fieldset_key(request):
+    """Stable fragment for cache keys of responses whose shape depends on ?fields/?omit."""
+    fields, omit = _names(request, FIELDS_PARAM), _names(request, OMIT_PARAM)
+    return f"{','.join(sorted(fields))}|{','.join(sorted(omit))}"
+
+
+class SparseFieldsMixin:
+    """Serializer mixin honouring ?fields= / ?omit= on the request in context. `id` is always kept."""
+
+    def _is_root(self):
+        parent = self.parent
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or not self._is_root():
+            return fields
+        requested, omit = _names(request, FIELDS_PARAM), _names(request, OMIT_PARAM)
+        if not requested and not omit:
+            return fields
+        return {
+            name: field for name, field in fields.items()
+            if name == 'id' or ((not requested or name in requested) and name not in omit)
+        }
@@ -0,0 +1,74 @@
+"""Diff-based sync of a lawyer's child rows (availability, practice areas, education).
+
+Profile saves used to delete every child row and re-insert them one at a
+time. `sync_children` matches the incoming rows to the existing ones on a
+natural key and issues at most one bulk_create, one bulk_update and one
+delete inside a transaction, so unchanged rows keep their ids.
+
+bulk_create/bulk_update send no post_save signals: callers run the matching
+hook from signals.py (e.g. `availability_rows_changed`) when the result
+reports a change.
+"""
+from collections import namedtuple
+
+from django.db import transaction
+
+AVAILABILITY_KEY = ('date', 'day_of_week', 'start_time')
+PRACTICE_AREA_KEY = ('area',)
+EDUCATION_KEY = ('institution', 'degree', 'year_graduated')
+
+
+class SyncResult(namedtuple('SyncResult', 'created updated deleted')):
+    @property
+    def changed(self):
+        return any(self)
+
+
+def _clean(model, row):
+    return {name: model._meta.get_field(name).to_python(value) for name, value in row.items()}
+
+
+def sync_children(queryset, rows, key, parent):
+    """Make `queryset` hold exactly `rows` (dicts of field values).
+
+    Rows are matched on the `key` fields; a matched row whose other fields
+    differ is updated, unmatched incoming rows are created with the `parent`
+    values (e.g. {'lawyer': profile}) and unmatched existing rows deleted.
+    When several incoming rows share a key the first one wins.
+    """
+    model = queryset.model
+    incoming = {}
+    for row in rows:
+        row = _clean(model, row)
+        incoming.setdefault(tuple(row.get(name) for name in key), row)
+
+    with transaction.atomic():
+        existing = {}
+        stale = []
+        for obj in queryset.select_for_update():
+            obj_key = tuple(getattr(obj, name) for name in key)
+            if obj_key in incoming and obj_key not in existing:
+                existing[obj_key] = obj
+            else:
+                stale.append(obj.pk)
+
+        to_create, to_update, update_fields = [], [], set()
+        for row_key, row in incoming.items():
+            obj = existing.get(row_key)
+            if obj is None:
+                to_create.append(model(**parent, **row))
+                continue
+            changed = {name for name, value in row.items() if name not in key and getattr(obj, name) != value}
+            if changed:
+                for name in changed:
+                    setattr(obj, name, row[name])
+                to_update.append(obj)
+                update_fields |= changed
+
+        if to_create:
+            model.objects.bulk_create(to_create)
+        if to_update:
+            model.objects.bulk_update(to_update, sorted(update_fields))
+        if stale:
+            model.objects.filter(pk__in=stale).delete()
+    return SyncResult(len(to_create), len(to_update), len(stale))
@@ -0,0 +1,146 @@
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.bookings.models import Booking
+from apps.bookings.slot_engine import first_free
+from .cities import alias_index, match_city
+from .free_slots import _minutes, filter_free
+from .management.commands.check_query_plans import Command as CheckQueryPlans
+from .models import Availability, LawyerProfile, PracticeArea
+from .next_slot import DAY_ABBRS
+from .serializers import LawyerListSerializer
+
+
+class FreeSlotFilterTests(TestCase):
+    """filter_free must agree with slot_engine, which works in Python integers.
+
+    The cases below only come out right with integer division of the minute
+    expressions; they fail on a backend where EXTRACT yields a non-integer type
+    (PostgreSQL) unless the minutes are cast.
+    """
+
+    day = date(2030, 1, 7)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = User.objects.create_user(phone='09000000001', first_name='C', last_name='U', role='customer')
+
+    def lawyer(self, rules, bookings=()):
+        n = LawyerProfile.objects.count()
+        user = User.objects.create_user(phone=f'0911000{n:04d}', first_name='L', last_name=str(n), role='lawyer')
+        profile = LawyerProfile.objects.create(user=user, bar_number=f'T{n}', verification_status='verified')
+        for start, end, duration in rules:
+            Availability.objects.create(
+                lawyer=profile, day_of_week=DAY_ABBRS[self.day.weekday()],
+                start_time=start, end_time=end, slot_duration_minutes=duration,
+            )
+        for start, duration in bookings:
+            Booking.objects.create(
+                customer=self.customer, lawyer=profile, subject='t', status='confirmed', duration_minutes=duration,
+                scheduled_at=timezone.make_aware(datetime.combine(self.day, start)),
+            )
+        return profile
+
+    def assert_free(self, profile, expected, at=None):
+        found = filter_free(LawyerProfile.objects.filter(pk=profile.pk), self.day, at).exists()
+        self.assertEqual(found, expected)
+        avails = list(profile.availability.all())
+        bookings = [(datetime.combine(self.day, start), duration) for start, duration in
+                    ((timezone.localtime(b.scheduled_at).time(), b.duration_minutes) for b in profile.bookings.all())]
+        if at is None:
+            self.assertEqual(first_free(self.day, avails, bookings) is not None, expected)
+
+    def test_minutes_are_integers(self):
+        self.lawyer([(time(9, 0), time(11, 30), 60)])
+        row = Availability.objects.annotate(start_min=_minutes('start_time'), end_min=_minutes('end_time')).annotate(
+            slot_count=(_minutes('end_time') - _minutes('start_time')) / 60,
+        ).values('start_min', 'end_min', 'slot_count').get()
+        self.assertEqual(row, {'start_min': 540, 'end_min': 690, 'slot_count': 2})
+        self.assertIsInstance(row['slot_count'], int)
+
+    def test_rule_shorter_than_one_slot_is_not_free(self):
+        self.assert_free(self.lawyer([(time(9, 0), time(9, 30), 60)]), False)
+
+    def test_candidate_after_booking_snaps_to_slot_grid(self):
+        # Slots 9-10 and 10-11 are both overlapped; a fractional candidate at 10:15 would look free.
+        self.assert_free(self.lawyer([(time(9, 0), time(11, 30), 60)], [(time(9, 0), 75)]), False)
+
+    def test_free_slot_after_off_grid_booking(self):
+        self.assert_free(self.lawyer([(time(9, 0), time(12, 0), 60)], [(time(9, 0), 75)]), True)
+
+    def test_slot_at(self):
+        profile = self.lawyer([(time(9, 0), time(12, 0), 60)], [(time(9, 0), 75)])
+        self.assert_free(profile, False, at=time(10, 0))
+        self.assert_free(profile, True, at=time(11, 0))
+        self.assert_free(profile, False, at=time(11, 30))
+
+
+class LawyerPageQueryTests(TestCase):
+    """Rendering a page whose next-slot columns are stale costs the same queries at any page size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        customer = User.objects.create_user(phone='09000000002', first_name='C', last_name='U', role='customer')
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        for n in range(12):
+            user = User.objects.create_user(phone=f'0912000{n:04d}', first_name='L', last_name=str(n), role='lawyer')
+            profile = LawyerProfile.objects.create(user=user, bar_number=f'P{n}', verification_status='verified')
+            PracticeArea.objects.create(lawyer=profile, area='family', is_primary=True)
+            for day in DAY_ABBRS:
+                Availability.objects.create(lawyer=profile, day_of_week=day, start_time=time(9), end_time=time(17))
+            Booking.objects.create(
+                customer=customer, lawyer=profile, subject='t', status='confirmed',
+                scheduled_at=timezone.make_aware(datetime.combine(tomorrow, time(9))),
+            )
+        LawyerProfile.objects.update(next_slot_refreshed_on=timezone.localdate() - timedelta(days=1))
+
+    def render(self, size):
+        page = LawyerProfile.objects.select_related('user').prefetch_related('practice_areas').order_by('id')[:size]
+        with CaptureQueriesContext(connection) as queries:
+            data = LawyerListSerializer(page, many=True).data
+        self.assertEqual(len(data), size)
+        self.assertTrue(all(row['first_available_slot'] for row in data))
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.assertEqual(self.render(3), self.render(12))
+
+    def test_stale_rows_are_recomputed_in_one_batch(self):
+        # page + practice areas prefetch + one Availability and one Booking query for the page
+        with self.assertNumQueries(4):
+            LawyerListSerializer(
+                LawyerProfile.objects.select_related('user').prefetch_related('practice_areas'), many=True,
+            ).data
+
+
+class QueryPlanTests(TestCase):
+    """Every hot directory/booking query in check_query_plans is served by an index."""
+
+    def test_hot_queries_do_not_scan_whole_tables(self):
+        command = CheckQueryPlans(stdout=StringIO())
+        command.verbose = False
+        command.seed(50)
+        failures = command.check_all()
+        self.assertEqual(failures, [], command.stdout.getvalue())
+
+
+class MatchCityTests(SimpleTestCase):
+    index = alias_index(
+        [('tehran', 'تهران', 'Tehran'), ('kermanshah', 'کرمانشاه', 'Kermanshah'), ('kerman', 'کرمان', 'Kerman')],
+        [('بندر عباس', 'bandar_abbas')],
+    )
+
+    def test_city_segment_beats_street_name(self):
+        self.assertEqual(match_city(self.index, ['خیابان کرمانشاه، تهران']), 'tehran')
+        self.assertEqual(match_city(self.index, ['تهران، خیابان کرمانشاه']), 'tehran')
+
+    def test_last_alias_in_free_text(self):
+        self.assertEqual(match_city(self.index, ['خیابان کرمانشاه تهران']), 'tehran')
+        self.assertEqual(match_city(self.index, ['دفتر در بندر عباس']), 'bandar_abbas')
+        self.assertEqual(match_city(self.index, ['Kermanshah']), 'kermanshah')
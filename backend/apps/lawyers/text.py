@@ -0,0 +1,47 @@
+"""Persian-aware text normalization shared by search, admin filters and Justive.
+
+Apply `normalize` both when indexing and when querying so Arabic/Persian
+letter variants, ZWNJ spellings, Persian/Arabic-Indic digits and the Arabic
+decimal separator compare equal. Filters match the normalized copies kept in
+LawyerSearchDocument, LawyerTrigram and User.search_name rather than the raw
+columns.
+"""
+import re
+
+_CHAR_MAP = str.maketrans({
+    'ي': 'ی', 'ى': 'ی', 'ئ': 'ی',  # Arabic yeh -> Persian yeh
+    'ك': 'ک',  # Arabic kaf -> Persian kaf
+    'ة': 'ه', 'ۀ': 'ه',
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ؤ': 'و',
+    '\u200c': ' ', '\u200d': ' ',  # ZWNJ / ZWJ
+    '\u200e': '', '\u200f': '', '\ufeff': '', '\u0640': '',  # direction marks, BOM, tatweel
+    '\u066b': '.', '\u066c': ',',  # Arabic decimal / thousands separators
+    **{chr(0x06F0 + i): str(i) for i in range(10)},  # Persian digits
+    **{chr(0x0660 + i): str(i) for i in range(10)},  # Arabic-Indic digits
+})
+_DIACRITICS_RE = re.compile('[\u064b-\u065f\u0670]')
+_SPACES_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize(text):
+    """Canonical form for matching: Persian letters, ASCII digits, no diacritics, casefolded."""
+    text = _DIACRITICS_RE.sub('', str(text or '').translate(_CHAR_MAP))
+    return _SPACES_RE.sub(' ', text).strip().casefold()
+
+
+def trigrams(text):
+    """pg_trgm-style trigrams: each word padded with two leading and one trailing space."""
+    grams = set()
+    for word in _WORD_RE.findall(normalize(text)):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    ga, gb = trigrams(a), trigrams(b)
+    if not ga or not gb:
+        return 0.0
+    return len(ga & gb) / len(ga | gb)
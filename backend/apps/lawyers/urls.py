@@ -4,6 +4,8 @@ from . import views
 urlpatterns = [
     path('justive/analyze/', views.justive_analyze, name='justive_analyze'),
     path('', views.LawyerListView.as_view(), name='lawyer_list'),
+    path('facets/', views.LawyerFacetsView.as_view(), name='lawyer_facets'),
+    path('autocomplete/', views.autocomplete_view, name='lawyer_autocomplete'),
     path('<uuid:id>/', views.LawyerDetailView.as_view(), name='lawyer_detail'),
     path('me/profile/', views.my_profile, name='my_lawyer_profile'),
     path('me/dashboard/', views.lawyer_dashboard_stats, name='lawyer_dashboard'),
@@ -0,0 +1,28 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Case, When, Value, IntegerField
+from django.utils import timezone
+
+
+def order_by_ids(queryset, ids, annotation='position'):
+    """Restrict `queryset` to `ids` and annotate each row with its index in that list."""
+    ids = list(ids)
+    if not ids:
+        return queryset.none()
+    position = Case(
+        *[When(id=pk, then=Value(i)) for i, pk in enumerate(ids)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(id__in=ids).annotate(**{annotation: position})
+
+
+def day_bounds(first_day, last_day=None):
+    """Aware [start, end) datetimes covering whole local days.
+
+    Filter with `scheduled_at__gte/__lt` instead of `scheduled_at__date`: the
+    `__date` lookup wraps the column in a function, so no index can serve it.
+    """
+    last_day = last_day or first_day
+    start = timezone.make_aware(datetime.combine(first_day, time.min))
+    end = timezone.make_aware(datetime.combine(last_day + timedelta(days=1), time.min))
+    return start, end
@@ -3,54 +3,160 @@ import requests
 from django.conf import settings
 from rest_framework import generics, filters, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
 from django.db import models
+from django.utils import timezone
 
 from .models import LawyerProfile, Review
+from .autocomplete import DEFAULT_LIMIT, autocomplete
+from .cache import list_cache_key, detail_cache_key, get_cached, lawyer_version, set_cached
+from .cities import city_name, city_q, resolve_city
+from .conditional import body_etag, make_etag, not_modified, set_validators
 from .serializers import (
-    LawyerListSerializer, LawyerDetailSerializer,
-    LawyerProfileUpdateSerializer, CreateReviewSerializer, AvailabilitySerializer,
+    LawyerListSerializer, LawyerDetailSerializer, LawyerProfileUpdateSerializer,
+    CreateReviewSerializer, ReviewSerializer, AvailabilitySerializer,
+    latest_reviews_prefetch, my_review_annotations, my_review_from_annotations,
 )
-from .filters import LawyerFilter
+from .facets import compute_facets
+from .geo import near_key
+from .filters import LawyerFilter, LawyerSearchFilter, LawyerOrderingFilter
+from .pagination import KeysetPagination, LawyerPagination
 from .permissions import IsLawyer
+from .sparse import fieldset_key, wants
+from .text import normalize
 
 
 class LawyerListView(generics.ListAPIView):
     serializer_class = LawyerListSerializer
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, LawyerSearchFilter, LawyerOrderingFilter]
     filterset_class = LawyerFilter
-    search_fields = ['user__first_name', 'user__last_name', 'headline', 'bio', 'bar_number', 'practice_areas__area']
-    ordering_fields = ['average_rating', 'years_experience', 'hourly_rate', 'total_bookings']
-    ordering = ['-is_featured', '-average_rating']
+    ordering_fields = ['rank_score', 'average_rating', 'years_experience', 'hourly_rate', 'total_bookings']
+    ordering = ['-rank_score', 'id']
+    pagination_class = LawyerPagination
 
     def get_queryset(self):
-        return (
-            LawyerProfile.objects
-            .filter(verification_status='verified')
-            .select_related('user')
-            .prefetch_related('practice_areas', 'availability')
-            .distinct()
+        queryset = LawyerProfile.objects.filter(verification_status='verified').select_related('user').distinct()
+        if wants(self.request, 'practice_areas', 'primary_area'):
+            queryset = queryset.prefetch_related('practice_areas')
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """Cached per filter state; the ETag is the hash of the cached body, so a match is a 304."""
+        key = list_cache_key(request)
+        entry = get_cached('list', key)
+        if entry is not None:
+            return not_modified(request, entry['etag']) or Response(
+                entry['data'], headers={'X-Cache': 'HIT', 'ETag': entry['etag']},
+            )
+        response = super().list(request, *args, **kwargs)
+        etag = body_etag(response.data)
+        set_cached(key, {'etag': etag, 'data': response.data})
+        response['X-Cache'] = 'MISS'
+        return not_modified(request, etag) or set_validators(response, etag)
+
+
+class LawyerFacetsView(generics.GenericAPIView):
+    """Counts per practice area, city, fee bucket, rating bucket and accepting status
+    for the current filter state (same params as the list endpoint)."""
+    permission_classes = [AllowAny]
+    filter_backends = [DjangoFilterBackend, LawyerSearchFilter]
+    filterset_class = LawyerFilter
+
+    def get_queryset(self):
+        return LawyerProfile.objects.filter(verification_status='verified')
+
+    def get(self, request, *args, **kwargs):
+        key = list_cache_key(request, kind='facets')
+        entry = get_cached('facets', key)
+        cache_status = 'HIT'
+        if entry is None:
+            cache_status = 'MISS'
+            data = compute_facets(self.filter_queryset(self.get_queryset()))
+            entry = {'etag': body_etag(data), 'data': data}
+            set_cached(key, entry)
+        return not_modified(request, entry['etag']) or Response(
+            entry['data'], headers={'X-Cache': cache_status, 'ETag': entry['etag']},
         )
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def autocomplete_view(request):
+    """Search-box suggestions (lawyers, practice areas, cities) from the in-process prefix index."""
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    query = request.query_params.get('q', '')
+    return Response({'query': query, 'results': autocomplete(query, limit)})
+
+
 class LawyerDetailView(generics.RetrieveAPIView):
     serializer_class = LawyerDetailSerializer
     permission_classes = [AllowAny]
     lookup_field = 'id'
 
     def get_queryset(self):
+        # (prefetch, fields that need it)
+        detail_prefetches = [
+            ('practice_areas', ('practice_areas', 'primary_area')),
+            ('education', ('education',)),
+            ('availability', ('availability',)),
+            (latest_reviews_prefetch(), ('reviews',)),
+        ]
+        prefetches = [prefetch for prefetch, fields in detail_prefetches if wants(self.request, *fields)]
         return (
             LawyerProfile.objects
             .filter(verification_status='verified')
             .select_related('user')
-            .prefetch_related('practice_areas', 'education', 'availability', 'reviews__customer')
+            .prefetch_related(*prefetches)
             .distinct()
         )
 
+    def retrieve(self, request, *args, **kwargs):
+        """Answers If-None-Match with a 304 from one indexed lookup and the cached version.
+
+        Otherwise cached for everyone; only the per-user `my_review` is computed per request.
+        """
+        lawyer_id = kwargs[self.lookup_field]
+        with_my_review = wants(request, 'my_review')
+        # The viewer's own review rides along as subquery annotations on the validator lookup.
+        annotations = my_review_annotations(request) if with_my_review else {}
+        row = (
+            LawyerProfile.objects.filter(id=lawyer_id, verification_status='verified')
+            .annotate(**annotations)
+            .values('id', *annotations).first()
+        )
+        if row is None:
+            raise NotFound()
+        # No Last-Modified: reviews, bookings and schedule changes move the version, not updated_at.
+        version = lawyer_version(lawyer_id)
+        viewer = request.user.pk if with_my_review and request.user.is_authenticated else ''
+        etag = make_etag(lawyer_id, version, timezone.localdate(), request.get_host(),
+                         fieldset_key(request), near_key(request), viewer)
+        vary = ['Authorization'] if with_my_review else None
+        response = not_modified(request, etag, vary=vary)
+        if response is not None:
+            return response
+
+        key = detail_cache_key(request, lawyer_id, version)
+        data = get_cached('detail', key)
+        cache_status = 'HIT'
+        if data is None:
+            cache_status = 'MISS'
+            data = dict(self.get_serializer(self.get_object()).data)
+            if 'my_review' in data:
+                data['my_review'] = None
+            set_cached(key, data)
+        if 'my_review' in data:
+            data = dict(data, my_review=my_review_from_annotations(row, request))
+        return set_validators(Response(data, headers={'X-Cache': cache_status}), etag, vary=vary)
+
 
 @api_view(['GET', 'PUT', 'PATCH'])
 @permission_classes([IsAuthenticated, IsLawyer])
@@ -103,17 +209,32 @@ def my_profile(request):
         updated.save(update_fields=['office_address'])
 
     if areas:
-        from .models import PracticeArea
-        updated.practice_areas.all().delete()
-        for index, area in enumerate(areas):
-            PracticeArea.objects.create(lawyer=updated, area=area, is_primary=(index == 0))
+        from .signals import practice_areas_changed
+        from .sync import PRACTICE_AREA_KEY, sync_children
+        rows = [{'area': area, 'is_primary': index == 0} for index, area in enumerate(areas)]
+        if sync_children(updated.practice_areas.all(), rows, PRACTICE_AREA_KEY, {'lawyer': updated}).changed:
+            practice_areas_changed([updated.id])
 
     return Response(LawyerDetailSerializer(updated, context={'request': request}).data)
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
+class ReviewPagination(KeysetPagination):
+    page_size = 10
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticatedOrReadOnly])
 def add_review(request, lawyer_id):
-    """Customers can review a lawyer after a completed booking."""
+    """GET: newest-first reviews of a lawyer, keyset paginated (`?cursor=`, `?page_size=`).
+    POST: customers can review a lawyer after a completed booking."""
+    if request.method == 'GET':
+        if not LawyerProfile.objects.filter(id=lawyer_id, verification_status='verified').exists():
+            return Response({'detail': 'وکیل پیدا نشد.'}, status=404)
+        paginator = ReviewPagination()
+        reviews = Review.objects.filter(lawyer_id=lawyer_id).select_related('customer').order_by('-created_at', '-id')
+        page = paginator.paginate_queryset(reviews, request)
+        data = ReviewSerializer(page, many=True, context={'request': request}).data
+        return paginator.get_paginated_response(data)
+
     if request.user.role != 'customer':
         return Response({'detail': 'فقط موکل می‌تواند امتیاز ثبت کند.'}, status=403)
 
@@ -202,69 +323,78 @@ def lawyer_dashboard_stats(request):
     })
 
 
+AVAILABILITY_RANGE_MAX_DAYS = 92
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated, IsLawyer])
 def availability_day(request):
-    """Get/save exact working hours for one calendar date."""
-    from datetime import datetime
+    """Get/save exact working hours for one calendar date (`date`), or for every
+    date of a range (`from` + `to`, e.g. a vacation or a whole week) in one request."""
+    from datetime import datetime, timedelta
     from .models import Availability
+    from .signals import availability_rows_changed
+    from .sync import AVAILABILITY_KEY, sync_children
 
     try:
         profile = LawyerProfile.objects.get(user=request.user)
     except LawyerProfile.DoesNotExist:
         return Response({'detail': 'Profile not found.'}, status=404)
 
-    date_str = request.query_params.get('date') or request.data.get('date')
-    if not date_str:
-        return Response({'detail': 'date is required.'}, status=400)
+    def param(name):
+        return request.query_params.get(name) or request.data.get(name)
+
+    date_str = param('date')
+    from_str, to_str = param('from'), param('to')
+    if not date_str and not (from_str and to_str):
+        return Response({'detail': 'date (or from and to) is required.'}, status=400)
 
     try:
-        target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        if date_str:
+            first_day = last_day = datetime.strptime(date_str, '%Y-%m-%d').date()
+        else:
+            first_day = datetime.strptime(from_str, '%Y-%m-%d').date()
+            last_day = datetime.strptime(to_str, '%Y-%m-%d').date()
     except ValueError:
         return Response({'detail': 'date format must be YYYY-MM-DD.'}, status=400)
 
+    if last_day < first_day:
+        return Response({'detail': 'to must not be before from.'}, status=400)
+    if (last_day - first_day).days + 1 > AVAILABILITY_RANGE_MAX_DAYS:
+        return Response({'detail': f'At most {AVAILABILITY_RANGE_MAX_DAYS} days per request.'}, status=400)
+    dates = [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+
     if request.method == 'GET':
-        items = Availability.objects.filter(lawyer=profile, date=target_date).order_by('start_time')
+        items = Availability.objects.filter(lawyer=profile, date__range=(first_day, last_day)).order_by('date', 'start_time')
         return Response(AvailabilitySerializer(items, many=True, context={'request': request}).data)
 
     is_closed = str(request.data.get('is_closed', 'false')).lower() in ['1', 'true', 'yes', 'on']
-    Availability.objects.filter(lawyer=profile, date=target_date).delete()
-
     if is_closed:
-        item = Availability.objects.create(
-            lawyer=profile,
-            date=target_date,
-            day_of_week=None,
-            start_time='00:00',
-            end_time='00:00',
-            is_closed=True,
-            slot_duration_minutes=30,
-        )
-        return Response(AvailabilitySerializer([item], many=True, context={'request': request}).data)
+        hours = [{'start_time': '00:00', 'end_time': '00:00', 'is_closed': True}]
+    else:
+        slots = request.data.get('slots', [])
+        if isinstance(slots, str):
+            try:
+                slots = json.loads(slots)
+            except Exception:
+                slots = []
+        hours = []
+        for slot in slots:
+            start = slot.get('start_time') or slot.get('start')
+            end = slot.get('end_time') or slot.get('end')
+            if start and end:
+                hours.append({'start_time': start, 'end_time': end, 'is_closed': False})
+
+    rows = [
+        {'date': day, 'day_of_week': None, 'slot_duration_minutes': 30, **hour}
+        for day in dates for hour in hours
+    ]
+    existing = Availability.objects.filter(lawyer=profile, date__range=(first_day, last_day))
+    if sync_children(existing, rows, AVAILABILITY_KEY, {'lawyer': profile}).changed:
+        availability_rows_changed([profile.id])
 
-    slots = request.data.get('slots', [])
-    if isinstance(slots, str):
-        import json
-        try:
-            slots = json.loads(slots)
-        except Exception:
-            slots = []
-
-    created = []
-    for slot in slots:
-        start = slot.get('start_time') or slot.get('start')
-        end = slot.get('end_time') or slot.get('end')
-        if start and end:
-            created.append(Availability.objects.create(
-                lawyer=profile,
-                date=target_date,
-                day_of_week=None,
-                start_time=start,
-                end_time=end,
-                is_closed=False,
-                slot_duration_minutes=30,
-            ))
-    return Response(AvailabilitySerializer(created, many=True, context={'request': request}).data)
+    items = existing.order_by('date', 'start_time')
+    return Response(AvailabilitySerializer(items, many=True, context={'request': request}).data)
 
 
 @api_view(['POST'])
@@ -288,23 +418,23 @@ def justive_analyze(request):
         'tax_law': ['مالیات', 'دارایی', 'اظهارنامه'],
         'immigration': ['مهاجرت', 'ویزا', 'اقامت'],
     }
-    cities = ['تهران', 'مشهد', 'اصفهان', 'شیراز', 'تبریز', 'کرج', 'قم', 'اهواز', 'رشت', 'یزد']
-
     def local_result():
+        # Match on normalized text so Arabic yeh/kaf, ZWNJ and Persian digits don't miss keywords.
+        normalized = normalize(text)
         area = ''
         for k, words in areas.items():
-            if any(w in text for w in words):
+            if any(normalize(w) in normalized for w in words):
                 area = k
                 break
-        city = next((c for c in cities if c in text), '')
+        city = city_name(resolve_city(text))
         max_fee = ''
-        if '۳۰۰' in text or '300' in text:
+        if '300' in normalized:
             max_fee = '300000'
-        elif '۵۰۰' in text or '500' in text:
+        elif '500' in normalized:
             max_fee = '500000'
-        elif '۸۰۰' in text or '800' in text:
+        elif '800' in normalized:
             max_fee = '800000'
-        elif 'میلیون' in text or '1200' in text or '۱.۲' in text:
+        elif normalize('میلیون') in normalized or '1200' in normalized or '1.2' in normalized:
             max_fee = '1200000'
 
         answer = 'موضوع، شهر، بودجه و نوع مشاوره را بنویس تا وکیل مناسب‌تر را پیشنهاد بدهم.'
@@ -365,7 +495,7 @@ def justive_analyze(request):
     if result.get('area'):
         lawyers = lawyers.filter(practice_areas__area=result['area']).distinct()
     if result.get('city'):
-        lawyers = lawyers.filter(city__icontains=result['city'])
+        lawyers = lawyers.filter(city_q(result['city']))
     if result.get('max_fee'):
         try:
             lawyers = lawyers.filter(consultation_fee__lte=int(result['max_fee']))
@@ -0,0 +1,93 @@
+"""A local stand-in for an SMS provider speaking HTTPBackend's contract.
+
+Used by `manage.py fake_sms_provider` for manual end-to-end runs and by
+`manage.py benchmark_sms`, so delivery can be exercised and measured
+without network access. Speaks HTTP/1.1, so clients can keep connections
+alive, and can add latency or reject a share of messages.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SEND_PATH = '/send'
+BATCH_PATH = '/send-batch'
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # headers and body are separate writes; avoid delayed-ACK stalls on keep-alive
+
+    def do_POST(self):
+        server = self.server
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        except ValueError:
+            return self._reply(400, {'error': 'invalid json'})
+        if server.latency:
+            time.sleep(server.latency)
+
+        if self.path == SEND_PATH:
+            if not body.get('to') or not body.get('text'):
+                return self._reply(400, {'error': 'to and text are required'})
+            ok = server.accept(1)
+            return self._reply(200 if ok else 503, {'ok': ok})
+        if self.path == BATCH_PATH:
+            messages = body.get('messages') or []
+            if len(messages) > server.max_batch:
+                return self._reply(413, {'error': f'at most {server.max_batch} messages per batch'})
+            return self._reply(200, {'results': [
+                {'ok': True} if server.accept(1) else {'ok': False, 'error': 'rejected'} for _ in messages
+            ]})
+        return self._reply(404, {'error': 'not found'})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class FakeProvider(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, fail_rate=0.0, max_batch=100, verbose=False):
+        super().__init__((host, port), FakeProviderHandler)
+        self.latency = latency_ms / 1000
+        self.fail_rate = fail_rate
+        self.max_batch = max_batch
+        self.verbose = verbose
+        self.accepted = self.rejected = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def accept(self, count):
+        ok = random.random() >= self.fail_rate
+        with self.lock:
+            if ok:
+                self.accepted += count
+            else:
+                self.rejected += count
+        return ok
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve from a daemon thread (in-process use); returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import requests
+from django.core.management.base import BaseCommand
+
+from apps.otp.fake_provider import BATCH_PATH, SEND_PATH, FakeProvider
+from apps.otp.sms import BaseBackend, HTTPBackend, SMSError
+
+
+class UnpooledBackend(BaseBackend):
+    """One fresh connection per message: the baseline the pooled backend replaces."""
+
+    def __init__(self, url):
+        self.url = url
+
+    def send_many(self, messages):
+        errors = []
+        for phone, text in messages:
+            try:
+                response = requests.post(self.url, json={'to': phone, 'text': text}, timeout=5)
+                errors.append(None if response.status_code < 300 else SMSError(response.status_code))
+            except requests.RequestException as exc:
+                errors.append(SMSError(str(exc)))
+        return errors
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))] if values else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure SMS gateway throughput and latency against the in-process fake provider '
+        '(no network): fresh connection per message vs pooled session vs pooled batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=2000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--batch', type=int, default=50, help='Messages per request for the batch variant.')
+        parser.add_argument('--latency', type=float, default=0, help='Milliseconds the fake provider adds per request.')
+        parser.add_argument('--rate-limit', type=float, default=0, help='Messages per second (0 = unlimited).')
+
+    def handle(self, *args, **options):
+        server = FakeProvider(latency_ms=options['latency'], max_batch=options['batch']).start()
+        send_url, batch_url = server.base_url + SEND_PATH, server.base_url + BATCH_PATH
+        common = {'pool_size': options['threads'], 'rate_limit': options['rate_limit']}
+        variants = [
+            ('new connection', lambda: UnpooledBackend(send_url)),
+            ('pooled', lambda: HTTPBackend(url=send_url, batch_url='', **common)),
+            (f'pooled batch {options["batch"]}', lambda: HTTPBackend(
+                url=send_url, batch_url=batch_url, max_batch=options['batch'], **common)),
+        ]
+        self.stdout.write(f'{options["messages"]} messages, {options["threads"]} threads, '
+                          f'provider latency {options["latency"]:g} ms')
+        self.stdout.write(f'{"variant":<18} {"msg/s":>9} {"p50 ms":>8} {"p99 ms":>8} {"conns":>6} {"errors":>7}')
+        try:
+            for name, factory in variants:
+                connections = server.connections
+                rate, latencies, errors = self.run(factory(), options['messages'], options['threads'])
+                self.stdout.write(
+                    f'{name:<18} {rate:>9.0f} {percentile(latencies, 0.5) * 1000:>8.2f} '
+                    f'{percentile(latencies, 0.99) * 1000:>8.2f} {server.connections - connections:>6} {errors:>7}'
+                )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @staticmethod
+    def run(backend, count, threads):
+        """Send `count` messages through `backend` from `threads` threads; returns (msg/s, call latencies, errors)."""
+        messages = [(f'0912{n:07d}', f'Your Lexara OTP: {n % 1000000:06d}') for n in range(count)]
+        chunks = [messages[i:i + backend.max_batch] for i in range(0, count, backend.max_batch)]
+        lock = threading.Lock()
+        latencies, errors = [], [0]
+
+        def worker():
+            while True:
+                with lock:
+                    if not chunks:
+                        return
+                    chunk = chunks.pop()
+                started = time.perf_counter()
+                failed = sum(error is not None for error in backend.send_many(chunk))
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    errors[0] += failed
+
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return count / (time.perf_counter() - started), latencies, errors[0]
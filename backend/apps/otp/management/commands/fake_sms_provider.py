@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from apps.otp.fake_provider import BATCH_PATH, SEND_PATH, FakeProvider
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a local fake SMS provider for development. Point the HTTP backend at it with '
+        'SMS_BACKEND=apps.otp.sms.HTTPBackend, SMS_HTTP_URL=<url>/send and SMS_HTTP_BATCH_URL=<url>/send-batch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8025)
+        parser.add_argument('--latency', type=float, default=0, help='Milliseconds added to every request.')
+        parser.add_argument('--fail-rate', type=float, default=0.0, help='Share of messages to reject (0-1).')
+        parser.add_argument('--max-batch', type=int, default=100)
+
+    def handle(self, *args, **options):
+        server = FakeProvider(
+            options['host'], options['port'], latency_ms=options['latency'],
+            fail_rate=options['fail_rate'], max_batch=options['max_batch'], verbose=True,
+        )
+        self.stdout.write(f'Fake SMS provider on {server.base_url}{SEND_PATH} and {server.base_url}{BATCH_PATH}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Accepted {server.accepted}, rejected {server.rejected} messages over {server.connections} connections.'
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-16 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("otp", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="otprecord",
+            index=models.Index(
+                fields=["phone", "is_used", "created_at"], name="otp_phone_active_idx"
+            ),
+        ),
+    ]
@@ -15,6 +15,7 @@ class OTPRecord(models.Model):
     class Meta:
         db_table = 'otp_records'
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['phone', 'is_used', 'created_at'], name='otp_phone_active_idx')]
 
     def __str__(self):
         return f'{self.phone} — {self.code}'
@@ -0,0 +1,169 @@
+"""Pluggable SMS gateway used for OTP codes and the booking notification outbox.
+
+settings.SMS_BACKEND picks the implementation:
+
+    apps.otp.sms.ConsoleBackend   prints messages to the terminal (development default)
+    apps.otp.sms.HTTPBackend      JSON over HTTP to a provider (SMS_HTTP_* settings)
+
+`get_backend()` keeps one instance per process, so the HTTP backend's
+pooled requests.Session (keep-alive connections) and rate limiter live as
+long as the web or outbox worker process.
+
+HTTPBackend speaks a small generic contract; adapt `_single_request`,
+`_batch_request` and `_batch_results` in a subclass for a specific provider:
+
+    POST SMS_HTTP_URL        {"sender", "to", "text"}                    -> 2xx
+    POST SMS_HTTP_BATCH_URL  {"sender", "messages": [{"to", "text"}]}    -> {"results": [{"ok", "error"}]}
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = 'apps.otp.sms.ConsoleBackend'
+
+
+class SMSError(Exception):
+    pass
+
+
+class RateLimiter:
+    """Token bucket shared by the threads of one process: at most `rate` messages per second."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(rate, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, count=1):
+        """Block until `count` messages may go out. A batch larger than the burst
+        drives the bucket negative, so the messages after it wait proportionally."""
+        needed = min(count, self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= needed:
+                    self.tokens -= count
+                    return
+                wait = (needed - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class BaseBackend:
+    max_batch = 1
+
+    def send(self, phone, text):
+        """Send one message; raises SMSError on failure."""
+        error = self.send_many([(phone, text)])[0]
+        if error is not None:
+            raise error if isinstance(error, SMSError) else SMSError(str(error))
+
+    def send_many(self, messages):
+        """Send (phone, text) pairs (at most `max_batch`); returns one error or None per message."""
+        raise NotImplementedError
+
+
+class ConsoleBackend(BaseBackend):
+    max_batch = 1000
+
+    def send_many(self, messages):
+        for phone, text in messages:
+            # Development fallback: print SMS in backend terminal.
+            print(f'LEXARA SMS -> {phone}: {text}')
+        return [None] * len(messages)
+
+
+class HTTPBackend(BaseBackend):
+    def __init__(self, **options):
+        """Configured from SMS_HTTP_* settings; keyword `options` (url, batch_url, ...) override them."""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        def option(name, default=None):
+            return options.get(name, getattr(settings, f'SMS_HTTP_{name.upper()}', default))
+
+        self.url = option('url')
+        self.batch_url = option('batch_url', '')
+        self.sender = option('sender', '')
+        self.timeout = option('timeout', 5)
+        self.max_batch = option('max_batch', 100) if self.batch_url else 1
+        rate = options.get('rate_limit', getattr(settings, 'SMS_RATE_LIMIT', 0))
+        self.limiter = RateLimiter(rate) if rate else None
+
+        self.session = requests.Session()
+        api_key = option('api_key', '')
+        if api_key:
+            self.session.headers['Authorization'] = f'Bearer {api_key}'
+        # Only connection failures are retried here: a POST that reached the provider may have been sent.
+        adapter = HTTPAdapter(
+            pool_maxsize=option('pool_size', 10),
+            max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.1),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _single_request(self, phone, text):
+        return self.url, {'sender': self.sender, 'to': phone, 'text': text}
+
+    def _batch_request(self, messages):
+        return self.batch_url, {'sender': self.sender, 'messages': [{'to': p, 'text': t} for p, t in messages]}
+
+    def _batch_results(self, response, messages):
+        results = response.json().get('results') or []
+        if len(results) != len(messages):
+            raise SMSError('provider returned a result count that does not match the batch')
+        return [None if r.get('ok') else SMSError(r.get('error') or 'rejected') for r in results]
+
+    def _post(self, url, payload):
+        import requests
+
+        try:
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+        except requests.RequestException as exc:
+            raise SMSError(f'provider unreachable: {exc}') from exc
+        if response.status_code >= 300:
+            raise SMSError(f'provider answered {response.status_code}: {response.text[:200]}')
+        return response
+
+    def send_many(self, messages):
+        messages = list(messages)
+        if self.limiter:
+            self.limiter.acquire(len(messages))
+        if len(messages) > 1 and self.batch_url:
+            try:
+                return self._batch_results(self._post(*self._batch_request(messages)), messages)
+            except SMSError as exc:
+                return [exc] * len(messages)
+        errors = []
+        for phone, text in messages:
+            try:
+                self._post(*self._single_request(phone, text))
+                errors.append(None)
+            except SMSError as exc:
+                errors.append(exc)
+        return errors
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(getattr(settings, 'SMS_BACKEND', DEFAULT_BACKEND))()
+    return _backend
+
+
+def reset_backend():
+    """Drop the cached backend (after changing SMS_* settings, e.g. in benchmarks)."""
+    global _backend
+    _backend = None
@@ -25,6 +25,13 @@ def create_otp(phone: str) -> str:
     return code
 
 
+def send_otp(phone: str, code: str) -> None:
+    """Text the code through the configured SMS backend; raises sms.SMSError on failure."""
+    from .sms import get_backend
+
+    get_backend().send(phone, f"Your Lexara OTP: {code}")
+
+
 def verify_otp(phone: str, code: str) -> tuple[bool, str]:
     try:
         record = OTPRecord.objects.filter(
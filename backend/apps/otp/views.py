@@ -1,7 +1,8 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from .utils import create_otp
+from .sms import SMSError
+from .utils import create_otp, send_otp
 
 
 @api_view(['POST'])
@@ -11,5 +12,8 @@ def resend_otp(request):
     if not phone:
         return Response({'detail': 'Phone is required.'}, status=400)
     code = create_otp(phone)
-    # send_sms(phone, f"Your Lexara OTP: {code}")
+    try:
+        send_otp(phone, code)
+    except SMSError:
+        return Response({'detail': 'Could not send OTP. Please try again.'}, status=503)
     return Response({'detail': 'OTP resent.', '_dev_otp': code})
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from datetime import timedelta
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -81,6 +82,25 @@ DATABASES = {
     # }
 }
 
+# The directory response cache, its version counters and the autocomplete version
+# must be shared by every worker process, or invalidation only reaches the worker
+# that handled the write. Redis when REDIS_URL is set (needs the `redis` package),
+# otherwise a database table: run `python manage.py createcachetable` once.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'lexara_cache',
+        }
+    }
+
 AUTH_USER_MODEL = 'accounts.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -132,15 +152,47 @@ CORS_ALLOWED_ORIGINS = [
     'http://127.0.0.1:3000',
 ]
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['idempotent-replayed', 'retry-after']
+
+# ── Idempotency keys ──────────────────────────────────────────────────────────
+# POST /api/bookings/, .../cancel/ and .../documents/ replay the stored response for a repeated
+# Idempotency-Key (apps/bookings/idempotency.py). Run `manage.py purge_idempotency_keys` from cron.
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 24 * 3600))   # seconds a response is replayed
+IDEMPOTENCY_LOCK_SECONDS = 60   # an unfinished request older than this is presumed dead and its key reclaimable
 
 # ── OTP Settings ───────────────────────────────────────────────────────────────
 OTP_EXPIRY_MINUTES = 10
 OTP_LENGTH = 6
-# For production, integrate an SMS provider:
-# TWILIO_ACCOUNT_SID = os.environ.get('TWILIO_ACCOUNT_SID', '')
-# TWILIO_AUTH_TOKEN  = os.environ.get('TWILIO_AUTH_TOKEN', '')
-# TWILIO_PHONE_FROM  = os.environ.get('TWILIO_PHONE_FROM', '')
-# Or use any other SMS gateway (Vonage, AWS SNS, etc.)
+
+# ── SMS gateway ────────────────────────────────────────────────────────────────
+# OTP codes and booking notifications go through apps/otp/sms.py. The console backend prints them;
+# the HTTP backend posts to a provider over a pooled keep-alive session. For local runs point it at
+# `manage.py fake_sms_provider` (http://127.0.0.1:8025/send and /send-batch).
+SMS_BACKEND = os.environ.get('SMS_BACKEND', 'apps.otp.sms.ConsoleBackend')
+SMS_HTTP_URL = os.environ.get('SMS_HTTP_URL', '')
+SMS_HTTP_BATCH_URL = os.environ.get('SMS_HTTP_BATCH_URL', '')   # empty: provider has no batch endpoint
+SMS_HTTP_API_KEY = os.environ.get('SMS_HTTP_API_KEY', '')
+SMS_HTTP_SENDER = os.environ.get('SMS_HTTP_SENDER', '')
+SMS_HTTP_TIMEOUT = float(os.environ.get('SMS_HTTP_TIMEOUT', 5))    # seconds
+SMS_HTTP_POOL_SIZE = int(os.environ.get('SMS_HTTP_POOL_SIZE', 10))
+SMS_HTTP_MAX_BATCH = int(os.environ.get('SMS_HTTP_MAX_BATCH', 100))
+SMS_RATE_LIMIT = float(os.environ.get('SMS_RATE_LIMIT', 0))       # messages/second per process, 0 = unlimited
+
+# ── Lawyer directory cache ─────────────────────────────────────────────────────
+LAWYER_CACHE_TTL = int(os.environ.get('LAWYER_CACHE_TTL', 300))   # seconds
+
+# ── Lawyer directory ranking ───────────────────────────────────────────────────
+# Weights of the rank_score blend (apps/lawyers/ranking.py); omitted keys keep their defaults.
+# Run `manage.py recompute_rank_scores` after changing them.
+LAWYER_RANK_WEIGHTS = {
+    'rating': 3.0,
+    'reviews': 1.0,
+    'bookings': 1.0,
+    'recency': 0.5,
+    'availability': 1.0,
+    'featured': 2.0,
+}
 
 # ── File Upload ────────────────────────────────────────────────────────────────
 FILE_UPLOAD_MAX_MEMORY_SIZE = 20 * 1024 * 1024   # 20 MB